@@ -173,7 +173,7 @@ class ProductForm(forms.ModelForm):
         model = Product
         fields = "__all__"
         fields = ['name', 'english_name', 'categories', 'category_id', 'brand', 'price', 'featured', 'is_active',
-                  'owner_name',
+                  'seller', 'owner_name',
                   'owner_profile', 'short_description', 'description', 'features', 'view_image', 'rel_blogs',
                   'rel_news', 'rel_products']
 
@@ -218,6 +218,7 @@ class ProductForm(forms.ModelForm):
             "category_id": "دسته‌بندی",
             "price": "قیمت (تومان)",
             "featured": "ویژه",
+            "seller": "فروشنده",
             "owner_name": "نام مالک",
             "owner_profile": "پروفایل مالک",
             "short_description": "توضیح کوتاه",
@@ -258,6 +259,8 @@ class ProductForm(forms.ModelForm):
         # ---------- Empty labels for dropdowns ----------
         if "brand" in self.fields and isinstance(self.fields["brand"], forms.ModelChoiceField):
             self.fields["brand"].empty_label = "— انتخاب برند —"
+        if "seller" in self.fields and isinstance(self.fields["seller"], forms.ModelChoiceField):
+            self.fields["seller"].empty_label = "— بدون فروشنده —"
         for cat_key in ("category", "category_id"):
             if cat_key in self.fields and isinstance(self.fields[cat_key], forms.ModelChoiceField):
                 self.fields[cat_key].empty_label = "— انتخاب دسته —"
@@ -353,6 +356,13 @@ class CategoryForm(forms.ModelForm):
             "english_name": forms.TextInput(attrs={"class": "form-control", "dir": "ltr"}),
         }
 
+    def clean_parent(self):
+        parent = self.cleaned_data.get("parent")
+        inst = self.instance
+        if parent and inst and not inst._state.adding and (parent.pk == inst.pk or parent.is_descendant_of(inst)):
+            raise forms.ValidationError("دسته نمی‌تواند زیرمجموعه خودش یا فرزندانش باشد.")
+        return parent
+
 
 class CategoryCreateForm(CategoryForm):
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from blogs.models.blog import Blog
+from comments.models import Comment
+from news.models.news import News
+from orders import rollup
+from orders.models import Order
+from payments.models import FailedPayment
+from products.models.product import Product
+
+User = get_user_model()
+
+# Snapshot is refreshed by admin_dashboard.tasks.refresh_dashboard_metrics_task
+# (see CELERY_BEAT_SCHEDULE); the TTL only bounds staleness if beat is down.
+METRICS_CACHE_KEY = "admin_dashboard:metrics"
+METRICS_TTL = 120
+SERIES_DAYS = 8  # the chart shows today and the 7 days before it
+
+
+class DashboardMetricsService:
+    """
+    Admin dashboard counters + 7-day sales series.
+
+    Each table is read once with conditional aggregation (COUNT ... FILTER)
+    and the chart reads the per-day rollup, instead of a query per number.
+    Views read the cached snapshot; only a cold cache computes inline.
+    """
+
+    # get_snapshot() -> dict (cached)
+    def get_snapshot(self) -> Dict[str, Any]:
+        data = cache.get(METRICS_CACHE_KEY)
+        if data is None:
+            data = self.refresh()
+        return data
+
+    # refresh() -> dict, written to cache
+    def refresh(self) -> Dict[str, Any]:
+        data = self.compute()
+        cache.set(METRICS_CACHE_KEY, data, METRICS_TTL)
+        return data
+
+    # compute(now=None) -> {"users": {...}, "orders": {...}, ..., "sales_chart": {...}}
+    def compute(self, now: Optional[Any] = None) -> Dict[str, Any]:
+        now = now or timezone.now()
+        week_ago = now - timedelta(days=7)
+
+        users = User.objects.aggregate(
+            total=Count("id"),
+            active_week=Count("id", filter=Q(last_login__gte=week_ago)),
+        )
+        orders = Order.objects.aggregate(
+            total=Count("id"),
+            paid=Count("id", filter=Q(status="paid")),
+            pending=Count("id", filter=Q(status="pending")),
+            revenue=Sum("total_price", filter=Q(status="paid")),
+        )
+        comments = Comment.objects.aggregate(
+            total=Count("id"),
+            flagged=Count("id", filter=Q(status="flagged")),
+        )
+
+        return {
+            "generated_at": now.isoformat(),
+            "users": users,
+            "orders": {**orders, "revenue": int(orders["revenue"] or 0)},
+            "content": {
+                "blogs": Blog.objects.count(),
+                "news": News.objects.count(),
+                "products": Product.objects.filter(is_active=True).count(),
+            },
+            "comments": comments,
+            "failed_payments_week": FailedPayment.objects.filter(created_at__gte=week_ago).count(),
+            "sales_chart": self.sales_series(week_ago.date()),
+        }
+
+    # sales_series(start_date, days=SERIES_DAYS) -> {"labels": [iso dates], "data": [int]}
+    def sales_series(self, start_date, days: int = SERIES_DAYS) -> Dict[str, list]:
+        # a few DailySalesRollup rows instead of scanning Order
+        return rollup.daily_series(start_date, days, status="paid")
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from admin_dashboard.services import DashboardMetricsService
+
+
+@shared_task(name="refresh_dashboard_metrics_task")
+def refresh_dashboard_metrics_task():
+    DashboardMetricsService().refresh()
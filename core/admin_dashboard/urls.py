@@ -87,6 +87,7 @@ urlpatterns = [
 
     # Orders
     path('orders/', views.OrderListView.as_view(), name='admin_orders'),
+    path('orders/status/', views.bulk_update_order_status, name='admin_bulk_update_order_status'),
     path('orders/<int:pk>/', views.OrderDetailView.as_view(), name='admin_order_detail'),
     path('orders/<int:pk>/status/', views.update_order_status, name='admin_update_order_status'),
 
@@ -95,4 +96,5 @@ urlpatterns = [
 
     # API
     path('api/stats/', views.api_stats_summary, name='admin_api_stats'),
+    path('api/gateway/', views.api_gateway_stats, name='admin_api_gateway_stats'),
 ]
@@ -1,21 +1,18 @@
 # admin_dashboard/views.py
-import os
 import json
 from django import forms
 from django.views import View
 from django.urls import reverse
 from django.conf import settings
-from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.db import transaction
 from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models.functions import Cast
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from django.db.models import Sum, Q, CharField, Count
-from django.core.files.storage import default_storage
+from django.db.models import Q, CharField, Count
 from django.views.generic import ListView, DetailView
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404, redirect
@@ -24,18 +21,23 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from tags.models import Tag
 from tags.forms import TagForm
 from heroes.models import Hero
-from datetime import timedelta
 from accounts.models import User
 from banners.models import Banner
 from news.models.news import News
 from .utils import admin_required
+from .services import DashboardMetricsService
+from core.trigram import fuzzy_filter
+from core.pagination import KeysetPaginationMixin
+from core.uploads import UploadRejected, store_upload
 from blogs.models.blog import Blog
 from comments.models import Comment
 from logs.models import AdminActionLog
 from categories.models import Category
+from categories.services import ProductCategoryService
 from products.models.brand import Brand
 from orders.models import Order, CartItem
-from payments.models import FailedPayment
+from orders.services import BULK_STATUS_LIMIT, bulk_change_order_status, change_order_status
+from orders.zarinpal_client import get_gateway
 from products.models.product import Product
 from accounts.models import Writer, WriterPermission, Seller
 from .forms import (BlogForm, NewsForm, BannerForm, HeroForm, BrandForm, ProductForm, CategoryForm, CategoryCreateForm,
@@ -55,52 +57,27 @@ User = get_user_model()
 @staff_required
 def dashboard_home(request):
     """Main admin dashboard with key metrics and charts."""
-    now = timezone.now()
-    start_of_week = now - timedelta(days=7)
-
-    # Stats
-    total_users = User.objects.count()
-    active_users = User.objects.filter(last_login__gte=start_of_week).count()
-    total_products = Product.objects.filter(is_active=True).count()
-    total_blogs = Blog.objects.count()
-    total_news = News.objects.count()
-    total_orders = Order.objects.count()
-    total_revenue = Order.objects.filter(status='paid').aggregate(Sum('total_price'))['total_price__sum'] or 0
-    pending_orders = Order.objects.filter(status='pending').count()
-    failed_payments = FailedPayment.objects.filter(created_at__gte=start_of_week).count()
-    total_comments = Comment.objects.count()
-    flagged_comments = Comment.objects.filter(status='flagged').count()
+    # Counters + chart come from the cached snapshot (admin_dashboard.services)
+    metrics = DashboardMetricsService().get_snapshot()
 
     # Recent Orders (last 10)
     recent_orders = Order.objects.all().order_by('-created_at')[:10]
 
-    # Sales Chart Data (last 7 days)
-    dates = [(start_of_week + timedelta(days=i)).date() for i in range(8)]
-    sales_data = []
-    for date in dates:
-        day_start = timezone.make_aware(timezone.datetime.combine(date, timezone.datetime.min.time()))
-        day_end = day_start + timedelta(days=1)
-        daily_sales = Order.objects.filter(
-            status='paid',
-            created_at__range=(day_start, day_end)
-        ).aggregate(Sum('total_price'))['total_price__sum'] or 0
-        sales_data.append(int(daily_sales))
-
     context = {
-        'total_users': total_users,
-        'active_users': active_users,
-        'total_products': total_products,
-        'total_blogs': total_blogs,
-        'total_news': total_news,
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'pending_orders': pending_orders,
-        'failed_payments': failed_payments,
-        'total_comments': total_comments,
-        'flagged_comments': flagged_comments,
+        'total_users': metrics['users']['total'],
+        'active_users': metrics['users']['active_week'],
+        'total_products': metrics['content']['products'],
+        'total_blogs': metrics['content']['blogs'],
+        'total_news': metrics['content']['news'],
+        'total_orders': metrics['orders']['total'],
+        'total_revenue': metrics['orders']['revenue'],
+        'pending_orders': metrics['orders']['pending'],
+        'failed_payments': metrics['failed_payments_week'],
+        'total_comments': metrics['comments']['total'],
+        'flagged_comments': metrics['comments']['flagged'],
         'recent_orders': recent_orders,
-        'chart_labels': [d.isoformat() for d in dates],
-        'chart_data': sales_data,
+        'chart_labels': metrics['sales_chart']['labels'],
+        'chart_data': metrics['sales_chart']['data'],
     }
     return render(request, 'admin_dashboard/home.html', context)
 
@@ -109,11 +86,13 @@ def dashboard_home(request):
 # USER MANAGEMENT
 # =====================================
 
-class UserListView(ListView):
+class UserListView(KeysetPaginationMixin, ListView):
     model = User
     template_name = 'admin_dashboard/users/list.html'
     context_object_name = 'users'
     paginate_by = 20
+    # User has no join date and last_login is nullable, so newest accounts (pk) first
+    keyset_ordering = ('-id',)
 
     @method_staff_required
     def dispatch(self, *args, **kwargs):
@@ -121,8 +100,7 @@ class UserListView(ListView):
 
     def get_queryset(self):
         query = self.request.GET.get('q')
-        # Use last_login instead of date_joined
-        qs = User.objects.all().order_by('-last_login')
+        qs = User.objects.all().order_by(*self.keyset_ordering)
         if query:
             qs = qs.filter(phone_number__icontains=query) | qs.filter(full_name__icontains=query)
         return qs
@@ -207,11 +185,12 @@ class CommentModerationView(ListView):
 # E-COMMERCE MANAGEMENT
 # =====================================
 
-class OrderListView(ListView):
+class OrderListView(KeysetPaginationMixin, ListView):
     model = Order
     template_name = 'admin_dashboard/orders/list.html'
     context_object_name = 'orders'
     paginate_by = 20
+    keyset_ordering = ('-created_at', '-id')
 
     @method_staff_required
     def dispatch(self, *args, **kwargs):
@@ -219,11 +198,18 @@ class OrderListView(ListView):
 
     def get_queryset(self):
         status = self.request.GET.get('status')
-        qs = Order.objects.select_related('user').all().order_by('-created_at')
+        qs = Order.objects.select_related('user').all().order_by(*self.keyset_ordering)
         if status:
             qs = qs.filter(status=status)
         return qs
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # targets of the bulk status form: statuses an admin can move some order to
+        context['bulk_statuses'] = [(value, display) for value, display in Order.STATUS_CHOICES
+                                    if Order.admin_sources(value)]
+        return context
+
 
 class OrderDetailView(DetailView):
     model = Order
@@ -245,10 +231,12 @@ def update_order_status(request, pk):
 
     if new_status not in valid_statuses:
         return JsonResponse({'error': 'Invalid status'}, status=400)
+    if not order.can_admin_change_status(new_status):
+        return JsonResponse({'error': f'Cannot change status from {order.status} to {new_status}'}, status=400)
 
     old_status = order.status
-    order.status = new_status
-    order.save()
+    # conditional UPDATE + DailySalesRollup bookkeeping (orders.services)
+    change_order_status(order, new_status)
 
     AdminActionLog.objects.create(
         admin=request.user,
@@ -259,6 +247,44 @@ def update_order_status(request, pk):
     return JsonResponse({'success': True, 'new_status': new_status})
 
 
+def bulk_update_order_status(request):
+    """POST order_ids=<id>&order_ids=<id>...&status=<new>: one transition for many orders."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+
+    new_status = request.POST.get('status')
+    try:
+        order_ids = {int(pk) for pk in request.POST.getlist('order_ids')}
+    except ValueError:
+        return JsonResponse({'error': 'Invalid order id'}, status=400)
+    if not Order.admin_sources(new_status):
+        return JsonResponse({'error': 'Invalid status'}, status=400)
+    if not order_ids or len(order_ids) > BULK_STATUS_LIMIT:
+        return JsonResponse({'error': f'Select between 1 and {BULK_STATUS_LIMIT} orders'}, status=400)
+
+    with transaction.atomic():
+        changed, skipped = bulk_change_order_status(order_ids, new_status)
+        AdminActionLog.objects.bulk_create([
+            AdminActionLog(admin=request.user, action="Update Order Status",
+                           details=f"Order {pk}: {old_status} → {new_status}")
+            for pk, old_status in changed
+        ])
+
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'success': True, 'new_status': new_status,
+                             'updated': [pk for pk, _ in changed], 'skipped': skipped})
+
+    messages.success(request, f"وضعیت {len(changed)} سفارش تغییر کرد.")
+    if skipped:
+        messages.warning(request, f"{len(skipped)} سفارش به این وضعیت قابل انتقال نبود.")
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('admin_dashboard:admin_orders')
+
+
 # =====================================
 # MEDIA & LAYOUT MANAGEMENT
 # =====================================
@@ -281,15 +307,6 @@ class BrandListView(ListView):
     context_object_name = 'brands'
 
 
-try:
-    # Optional fuzzy search if Postgres + pg_trgm is available
-    from django.contrib.postgres.search import TrigramSimilarity
-
-    HAS_TRIGRAM = True
-except Exception:
-    HAS_TRIGRAM = False
-
-
 @method_staff_required
 class ProductListView(ListView):
     model = Product
@@ -313,34 +330,14 @@ class ProductListView(ListView):
         if field == 'status' and status in ('active', 'inactive'):
             qs = qs.filter(is_active=(status == 'active'))
 
-        # Name / English name / default (both with fuzzy)
+        # Name / English name: trigram word match `<%` (gin_trgm_ops index), so part of a long
+        # name still matches; default: ranked full-text search
         elif field in ('', 'name', 'english_name'):
             if q:
-                if HAS_TRIGRAM:
-                    # fuzzy similarity on selected field(s)
-                    if field == 'name':
-                        qs = qs.annotate(sim=TrigramSimilarity('name', q)).filter(
-                            Q(sim__gte=0.2) | Q(name__icontains=q)).order_by('-sim', '-created_at')
-                    elif field == 'english_name':
-                        qs = qs.annotate(sim=TrigramSimilarity('english_name', q)).filter(
-                            Q(sim__gte=0.2) | Q(english_name__icontains=q)).order_by('-sim', '-created_at')
-                    else:
-                        # both fields
-                        qs = qs.annotate(
-                            sim_name=TrigramSimilarity('name', q),
-                            sim_en=TrigramSimilarity('english_name', q),
-                        ).filter(
-                            Q(sim_name__gte=0.2) | Q(sim_en__gte=0.2) | Q(name__icontains=q) | Q(
-                                english_name__icontains=q)
-                        ).order_by('-sim_name', '-sim_en', '-created_at')
+                if field in ('name', 'english_name'):
+                    qs = fuzzy_filter(qs, q, [field], word=True).order_by('-sim', '-created_at')
                 else:
-                    # fallback icontains
-                    if field == 'name':
-                        qs = qs.filter(name__icontains=q)
-                    elif field == 'english_name':
-                        qs = qs.filter(english_name__icontains=q)
-                    else:
-                        qs = qs.filter(Q(name__icontains=q) | Q(english_name__icontains=q))
+                    qs = qs.search(q)
 
         # Category (name / english_name / slug)
         elif field == 'category' and q:
@@ -398,14 +395,15 @@ class ProductListView(ListView):
 # LOGS & ACTIVITY
 # =====================================
 
-class ActivityLogView(ListView):
+class ActivityLogView(KeysetPaginationMixin, ListView):
     model = AdminActionLog
     template_name = 'admin_dashboard/logs/activity.html'
     context_object_name = 'logs'
     paginate_by = 50
+    keyset_ordering = ('-timestamp', '-id')
 
     def get_queryset(self):
-        return AdminActionLog.objects.select_related('admin').order_by('-timestamp')
+        return AdminActionLog.objects.select_related('admin').order_by(*self.keyset_ordering)
 
 
 # =====================================
@@ -415,29 +413,18 @@ class ActivityLogView(ListView):
 @staff_required
 def api_stats_summary(request):
     """Returns JSON summary for dynamic dashboards."""
-    now = timezone.now()
-    week_ago = now - timedelta(days=7)
+    metrics = DashboardMetricsService().get_snapshot()
 
     data = {
-        'users': {
-            'total': User.objects.count(),
-            'active_week': User.objects.filter(last_login__gte=week_ago).count(),
-        },
+        'users': metrics['users'],
         'orders': {
-            'total': Order.objects.count(),
-            'paid': Order.objects.filter(status='paid').count(),
-            'revenue': float(
-                Order.objects.filter(status='paid').aggregate(Sum('total_price'))['total_price__sum'] or 0),
+            'total': metrics['orders']['total'],
+            'paid': metrics['orders']['paid'],
+            'revenue': float(metrics['orders']['revenue']),
         },
-        'content': {
-            'blogs': Blog.objects.count(),
-            'news': News.objects.count(),
-            'products': Product.objects.filter(is_active=True).count(),
-        },
-        'comments': {
-            'total': Comment.objects.count(),
-            'flagged': Comment.objects.filter(status='flagged').count(),
-        }
+        'content': metrics['content'],
+        'comments': metrics['comments'],
+        'generated_at': metrics['generated_at'],
     }
     return JsonResponse(data)
 
@@ -449,29 +436,29 @@ def api_stats_summary(request):
 @method_decorator(login_required, name="dispatch")
 class CategoryListView(View):
     template_name = "admin_dashboard/categories/list.html"
+    paginate_by = 100
 
     def get(self, request, *args, **kwargs):
-        def dfs(node: Category, level: int, parent_name: str | None):
-            rows.append({
-                "id": str(node.id),
-                "name": node.name,
-                "slug": node.slug,
-                "parent_name": parent_name,
-                "children_count": node.children.filter(is_active=True).count(),
-                "level": level,
-            })
-            for child in node.children.filter(is_active=True).order_by("name"):
-                dfs(child, level + 2, node.name)
-
-        roots = Category.objects.filter(is_active=True, parent__isnull=True).order_by("name")
-        rows: list[dict] = []
-        for r in roots:
-            dfs(r, level=0, parent_name=None)
+        # One recursive CTE returns rows already in DFS order with parent name + child count.
+        # ?depth=N limits the tree depth; ?depth / ?page switch to the paginated mode.
+        max_depth = _to_int_safe(request.GET.get("depth"))
+        flat = ProductCategoryService().get_flat_tree(max_depth=max_depth)
+
+        page_obj = None
+        if max_depth is not None or request.GET.get("page"):
+            page_obj = Paginator(flat, self.paginate_by).get_page(request.GET.get("page"))
+            source = page_obj.object_list
+        else:
+            source = flat
+
+        rows: list[dict] = [{**row, "level": row["depth"] * 2} for row in source]
 
         return render(request, self.template_name, {
             "flat_rows": rows,
             "categories": rows,
             "rows": rows,
+            "page_obj": page_obj,
+            "max_depth": max_depth,
         })
 
 
@@ -715,11 +702,8 @@ class AdminBlogListView(ListView):
         date_from = (self.request.GET.get('date_from') or '').strip()
         date_to = (self.request.GET.get('date_to') or '').strip()
 
-        if field == 'name' and value:
-            qs = qs.filter(name__icontains=value)
-
-        elif field == 'english_name' and value:
-            qs = qs.filter(english_name__icontains=value)
+        if field in ('name', 'english_name') and value:
+            qs = fuzzy_filter(qs, value, [field], word=True).order_by('-sim', '-publish_time')
 
         elif field == 'writer_name' and value:
             qs = qs.filter(writer_name__icontains=value)
@@ -745,7 +729,7 @@ class AdminBlogListView(ListView):
         # Legacy 'q' fallback (kept for compatibility)
         q = (self.request.GET.get('q') or '').strip()
         if q and not value:
-            qs = qs.filter(Q(name__icontains=q) | Q(english_name__icontains=q))
+            qs = fuzzy_filter(qs, q, ['name', 'english_name'], word=True).order_by('-sim', '-publish_time')
 
         return qs.distinct()  # important when tag joins are involved
 
@@ -942,22 +926,18 @@ def grapes_asset_upload(request):
     # Handles asset uploads from GrapesJS Asset Manager
     if request.method != "POST" or not request.FILES:
         return HttpResponseBadRequest("No file uploaded")
-    files = request.FILES.getlist("files")
-    urls = []
-    media_root = settings.MEDIA_ROOT
-    subdir = os.path.join("blogs", "content")
-    os.makedirs(os.path.join(media_root, subdir), exist_ok=True)
-
-    for f in files:
-        path = os.path.join(subdir, f.name)
-        full = os.path.join(media_root, path)
-        with open(full, "wb+") as dest:
-            for chunk in f.chunks():
-                dest.write(chunk)
-        urls.append(settings.MEDIA_URL + path)
+    urls, errors = [], []
+    for f in request.FILES.getlist("files"):
+        # content-addressed: re-uploading an image returns the existing URL (core.uploads)
+        try:
+            urls.append(store_upload(f, "blogs/content").url)
+        except UploadRejected as e:
+            errors.append(str(e))
+    if errors and not urls:
+        return JsonResponse({"error": " ".join(errors)}, status=400)
 
     # Grapes expects { data: [{src: "..."}] }
-    return JsonResponse({"data": [{"src": u} for u in urls]})
+    return JsonResponse({"data": [{"src": u} for u in urls], "errors": errors})
 
 
 @staff_required
@@ -1052,11 +1032,8 @@ class AdminNewsListView(ListView):
         date_from = (self.request.GET.get('date_from') or '').strip()
         date_to = (self.request.GET.get('date_to') or '').strip()
 
-        if field == 'name' and value:
-            qs = qs.filter(name__icontains=value)
-
-        elif field == 'english_name' and value:
-            qs = qs.filter(english_name__icontains=value)
+        if field in ('name', 'english_name') and value:
+            qs = fuzzy_filter(qs, value, [field], word=True).order_by('-sim', '-publish_time')
 
         elif field == 'writer_name' and value:
             qs = qs.filter(writer_name__icontains=value)
@@ -1082,7 +1059,7 @@ class AdminNewsListView(ListView):
         # Legacy 'q' fallback
         q = (self.request.GET.get('q') or '').strip()
         if q and not value:
-            qs = qs.filter(Q(name__icontains=q) | Q(english_name__icontains=q))
+            qs = fuzzy_filter(qs, q, ['name', 'english_name'], word=True).order_by('-sim', '-publish_time')
 
         return qs.distinct()
 
@@ -1571,10 +1548,10 @@ def api_get_product_data(request, product_id):
 def api_search_categories(request):
     from categories.models import Category
     q = (request.GET.get("q") or "").strip()
-    qs = Category.objects.all()
+    qs = Category.objects.all().order_by('name')
     if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(english_name__icontains=q) | Q(slug__icontains=q))
-    qs = qs.order_by('name')[:50]
+        qs = fuzzy_filter(qs, q, ['name', 'english_name', 'slug'], word=True).order_by('-sim', 'name')
+    qs = qs[:50]
     data = [{"id": str(c.pk), "text": c.name or c.english_name or c.slug or f"Category #{c.pk}"} for c in qs]
     return JsonResponse({"results": data})
 
@@ -1582,10 +1559,10 @@ def api_search_categories(request):
 @staff_required
 def api_search_blogs(request):
     q = (request.GET.get("q") or "").strip()
-    qs = Blog.objects.all()
+    qs = Blog.objects.select_related("writer").order_by("-publish_time")
     if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(english_name__icontains=q))
-    qs = qs.select_related("writer").order_by("-publish_time")[:20]
+        qs = fuzzy_filter(qs, q, ['name', 'english_name'], word=True).order_by('-sim', '-publish_time')
+    qs = qs[:20]
     data = [{"id": obj.pk, "text": obj.name or obj.english_name or f"Blog #{obj.pk}"} for obj in qs]
     return JsonResponse({"results": data})
 
@@ -1593,10 +1570,10 @@ def api_search_blogs(request):
 @staff_required
 def api_search_news(request):
     q = (request.GET.get("q") or "").strip()
-    qs = News.objects.all()
+    qs = News.objects.select_related("writer").order_by("-publish_time")
     if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(english_name__icontains=q))
-    qs = qs.select_related("writer").order_by("-publish_time")[:20]
+        qs = fuzzy_filter(qs, q, ['name', 'english_name'], word=True).order_by('-sim', '-publish_time')
+    qs = qs[:20]
     data = [{"id": obj.pk, "text": obj.name or obj.english_name or f"News #{obj.pk}"} for obj in qs]
     return JsonResponse({"results": data})
 
@@ -1604,10 +1581,10 @@ def api_search_news(request):
 @staff_required
 def api_search_products(request):
     q = (request.GET.get("q") or "").strip()
-    qs = Product.objects.all()
+    qs = Product.objects.select_related("brand").order_by("-created_at")
     if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(english_name__icontains=q))
-    qs = qs.select_related("brand").order_by("-created_at")[:20]
+        qs = qs.search(q)
+    qs = qs[:20]
 
     def label(p):
         t = p.name or p.english_name or f"Product #{p.pk}"
@@ -1617,29 +1594,14 @@ def api_search_products(request):
     return JsonResponse({"results": data})
 
 
-@method_staff_required
-class ProductListView(ListView):
-    model = Product
-    template_name = 'admin_dashboard/products/list.html'
-    context_object_name = 'products'
-    paginate_by = 10
-
-    def get_queryset(self):
-        q = self.request.GET.get('q')
-        qs = Product.objects.select_related('brand').all().order_by('-created_at')
-        if q:
-            qs = qs.filter(name__icontains=q) | qs.filter(english_name__icontains=q)
-        return qs
-
-
-def _save_extra_images(files):
-    """Save uploaded images and return a list of their media URLs/paths."""
+def _save_extra_images(request, files):
+    """Store uploaded images by content hash (core.uploads) and return their media URLs."""
     saved = []
     for f in files:
-        # store under products/<filename> (unique name is ensured by storage)
-        path = default_storage.save(f"products/{f.name}", ContentFile(f.read()))
-        # If you want absolute URL: settings.MEDIA_URL + path
-        saved.append(f"{settings.MEDIA_URL}{path}".rstrip("/"))
+        try:
+            saved.append(store_upload(f, "products").url)
+        except UploadRejected as e:
+            messages.warning(request, str(e))
     return saved
 
 
@@ -1666,12 +1628,13 @@ def product_create_view(request):
             # handle extra images
             extra_files = request.FILES.getlist("extra_images")
             if extra_files and hasattr(product, "images"):
-                new_urls = _save_extra_images(extra_files)
+                new_urls = _save_extra_images(request, extra_files)
                 try:
                     current = list(product.images or [])
                 except Exception:
                     current = []
-                product.images = current + new_urls
+                # an identical photo uploaded again resolves to the same URL
+                product.images = current + [u for u in dict.fromkeys(new_urls) if u not in current]
                 product.save(update_fields=["images"])
 
             AdminActionLog.objects.create(
@@ -1708,12 +1671,13 @@ def product_edit_view(request, pk):
 
             extra_files = request.FILES.getlist("extra_images")
             if extra_files and hasattr(product, "images"):
-                new_urls = _save_extra_images(extra_files)
+                new_urls = _save_extra_images(request, extra_files)
                 try:
                     current = list(product.images or [])
                 except Exception:
                     current = []
-                product.images = current + new_urls
+                # an identical photo uploaded again resolves to the same URL
+                product.images = current + [u for u in dict.fromkeys(new_urls) if u not in current]
                 product.save(update_fields=["images"])
 
             AdminActionLog.objects.create(
@@ -1958,9 +1922,9 @@ def admin_tag_list(request):
         blog_count=Count("blogs", distinct=True),
         news_count=Count("news_items", distinct=True),
     )
-    if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(slug__icontains=q))
     qs = qs.order_by("name")
+    if q:
+        qs = fuzzy_filter(qs, q, ['name', 'slug'], word=True).order_by('-sim', 'name')
     paginator = Paginator(qs, 20)
     page_obj = paginator.get_page(request.GET.get("page"))
     # usage_count را محاسبه کنیم
@@ -2009,3 +1973,13 @@ def admin_tag_delete(request, pk):
 
     # Fallback (not usually used if modal is in place)
     return render(request, "admin_dashboard/tags/delete.html", {"obj": tag})
+
+
+@staff_required
+def api_gateway_stats(request):
+    """Zarinpal client counters + circuit state (for the serving process only)."""
+    gateway = get_gateway()
+    return JsonResponse({
+        'circuit': gateway.breaker.state,
+        'operations': gateway.stats.snapshot(),
+    })
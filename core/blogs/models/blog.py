@@ -1,5 +1,6 @@
 from tags.models import Tag
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.conf import settings
 
 
@@ -26,5 +27,12 @@ class Blog(models.Model):
 
     content_project = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["name"], name="blog_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["english_name"], name="blog_en_name_trgm", opclasses=["gin_trgm_ops"]),
+            models.Index(fields=["-publish_time", "-id"], name="blog_publish_keyset_idx"),
+        ]
+
     def __str__(self):
         return self.name
@@ -1,6 +1,7 @@
 # blogs/views.py
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView, ListView, DetailView
+from core.pagination import KeysetPaginationMixin
 from django.shortcuts import get_object_or_404
 from .models.blog import Blog
 from .mongo_service.category_service import BlogCategoryService
@@ -38,13 +39,14 @@ class BlogCategoryDetailPage(LoginRequiredMixin, TemplateView):
 
 
 # ===== Blogs (PostgreSQL model) =====
-class BlogListPage(LoginRequiredMixin, ListView):
+class BlogListPage(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     template_name = "blogs/blog_list.html"
     context_object_name = "blogs"
     paginate_by = 10
+    keyset_ordering = ("-publish_time", "-id")
 
     def get_queryset(self):
-        qs = Blog.objects.all().order_by("-publish_time")
+        qs = Blog.objects.all().order_by(*self.keyset_ordering)
         # Optional filter by category via ?category=<mongo_id>
         category = self.request.GET.get("category")
         if category:
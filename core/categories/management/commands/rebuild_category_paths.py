@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from categories.models import Category
+from categories.tree import bump_version
+
+
+class Command(BaseCommand):
+    help = "Recomputes Category.path (materialized ancestor path) for every row, e.g. after bulk imports."
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            changed = Category.rebuild_paths()
+            transaction.on_commit(bump_version)
+        self.stdout.write(self.style.SUCCESS(f"✅ Category paths rebuilt ({changed} updated)."))
@@ -2,6 +2,7 @@
 from django.core.management import BaseCommand
 from django.db import transaction
 from categories.models import Category
+from categories.tree import bump_version
 
 
 class Command(BaseCommand):
@@ -293,4 +294,8 @@ class Command(BaseCommand):
             if to_link:
                 Category.objects.bulk_update(to_link, ["parent"])
 
+            # bulk_create/bulk_update bypass Category.save() and the model signals
+            Category.rebuild_paths()
+            transaction.on_commit(bump_version)
+
         self.stdout.write(self.style.SUCCESS("✅ Category seeding complete."))
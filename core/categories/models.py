@@ -1,7 +1,12 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 from django.utils.text import slugify
 import uuid
 
+PATH_SEP = "/"
+
 
 class Category(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -17,6 +22,10 @@ class Category(models.Model):
     )
     is_active = models.BooleanField(default=True)
 
+    # Materialized path: "<root hex>/<child hex>/.../<own hex>/" (self included).
+    # Descendants of X are exactly the rows whose path starts with X.path.
+    path = models.CharField(max_length=1024, blank=True, default="", editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -24,6 +33,10 @@ class Category(models.Model):
         indexes = [
             models.Index(fields=["is_active"]),
             models.Index(fields=["parent"]),
+            models.Index(fields=["path"], name="category_path_prefix_idx", opclasses=["varchar_pattern_ops"]),
+            GinIndex(fields=["name"], name="category_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["english_name"], name="category_en_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["slug"], name="category_slug_trgm", opclasses=["gin_trgm_ops"]),
         ]
         ordering = ["name"]
 
@@ -40,4 +53,51 @@ class Category(models.Model):
                 slug = f"{s}-{i}"
                 i += 1
             self.slug = slug
+
+        old_path = None
+        if not self._state.adding:
+            old_path = Category.objects.filter(pk=self.pk).values_list("path", flat=True).first()
+        self.path = self.build_path()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "path" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "path"]
         super().save(*args, **kwargs)
+
+        # moved: re-prefix the whole subtree in one UPDATE
+        if old_path and old_path != self.path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(self.path), Substr("path", len(old_path) + 1))
+            )
+
+    def build_path(self) -> str:
+        parent_path = ""
+        if self.parent_id:
+            parent_path = self.parent.path or self.parent.build_path()
+        return f"{parent_path}{self.id.hex}{PATH_SEP}"
+
+    def is_descendant_of(self, other) -> bool:
+        return bool(other.path) and self.path.startswith(other.path) and self.pk != other.pk
+
+    @classmethod
+    def rebuild_paths(cls) -> int:
+        """Recompute every path in memory and write back the ones that changed."""
+        rows = {pk: (parent_id, path) for pk, parent_id, path in cls.objects.values_list("id", "parent_id", "path")}
+        computed = {}
+
+        def resolve(pk, seen=()):
+            if pk in computed:
+                return computed[pk]
+            parent_id = rows[pk][0]
+            prefix = ""
+            if parent_id in rows and parent_id not in seen:
+                prefix = resolve(parent_id, seen + (pk,))
+            computed[pk] = f"{prefix}{pk.hex}{PATH_SEP}"
+            return computed[pk]
+
+        changed = []
+        for pk, (parent_id, path) in rows.items():
+            new_path = resolve(pk)
+            if new_path != path:
+                changed.append(cls(id=pk, path=new_path))
+        cls.objects.bulk_update(changed, ["path"], batch_size=500)
+        return len(changed)
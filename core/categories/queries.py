@@ -0,0 +1,105 @@
+"""
+Flattened, depth-first category listing built with one recursive CTE.
+
+Rows come back already in display order with their depth, parent name and
+active-children count, so listing pages never walk the tree node by node.
+"""
+from django.db import connection
+from .models import Category
+
+
+class FlatCategoryTree:
+    """
+    Lazy, sliceable view over the depth-first listing of active categories.
+
+    Works with django.core.paginator.Paginator: count() runs a COUNT over the CTE
+    and slicing pushes LIMIT/OFFSET down to Postgres. `max_depth` is the deepest
+    level included (0 = roots only, None = whole tree).
+    """
+
+    def __init__(self, max_depth=None):
+        self.max_depth = max_depth
+        self._count = None
+        self._rows = None
+
+    def _cte(self):
+        table = connection.ops.quote_name(Category._meta.db_table)
+        depth_filter = "WHERE t.depth < %s" if self.max_depth is not None else ""
+        params = [self.max_depth] if self.max_depth is not None else []
+        sql = f"""
+            WITH RECURSIVE ranked AS (
+                SELECT c.id, c.name, c.slug, c.parent_id,
+                       COALESCE(cc.n, 0) AS children_count,
+                       ROW_NUMBER() OVER (PARTITION BY c.parent_id ORDER BY c.name, c.id) AS pos
+                FROM {table} c
+                LEFT JOIN (
+                    SELECT parent_id, COUNT(*) AS n
+                    FROM {table}
+                    WHERE is_active AND parent_id IS NOT NULL
+                    GROUP BY parent_id
+                ) cc ON cc.parent_id = c.id
+                WHERE c.is_active
+            ),
+            tree AS (
+                SELECT r.id, r.name, r.slug, r.children_count,
+                       NULL::varchar AS parent_name, 0 AS depth, ARRAY[r.pos] AS sort_path
+                FROM ranked r
+                WHERE r.parent_id IS NULL
+                UNION ALL
+                SELECT r.id, r.name, r.slug, r.children_count,
+                       t.name, t.depth + 1, t.sort_path || r.pos
+                FROM ranked r
+                JOIN tree t ON r.parent_id = t.id
+                {depth_filter}
+            )
+        """
+        return sql, params
+
+    def _fetch(self, limit=None, offset=0):
+        sql, params = self._cte()
+        sql += "SELECT id, name, slug, parent_name, children_count, depth FROM tree ORDER BY sort_path"
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params += [limit, offset]
+        with connection.cursor() as cur:
+            cur.execute(sql, params)
+            return [
+                {
+                    "id": str(row[0]),
+                    "name": row[1],
+                    "slug": row[2],
+                    "parent_name": row[3],
+                    "children_count": row[4],
+                    "depth": row[5],
+                }
+                for row in cur.fetchall()
+            ]
+
+    def count(self):
+        if self._rows is not None:
+            return len(self._rows)
+        if self._count is None:
+            sql, params = self._cte()
+            with connection.cursor() as cur:
+                cur.execute(sql + "SELECT COUNT(*) FROM tree", params)
+                self._count = cur.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        if self._rows is None:
+            self._rows = self._fetch()
+        return iter(self._rows)
+
+    def __getitem__(self, key):
+        if self._rows is not None:
+            return self._rows[key]
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("FlatCategoryTree does not support stepped slices")
+            start = key.start or 0
+            limit = None if key.stop is None else max(key.stop - start, 0)
+            return self._fetch(limit=limit, offset=start)
+        return self._fetch(limit=1, offset=key)[0]
@@ -1,5 +1,8 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
+from django.db import transaction
 from .models import Category
+from .queries import FlatCategoryTree
+from .tree import get_tree, bump_version
 
 
 class ProductCategoryService:
@@ -46,31 +49,32 @@ class ProductCategoryService:
 
     # get_active_categories_by_parent(parent_id=None) -> list
     def get_active_categories_by_parent(self, parent_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        qs = Category.objects.filter(is_active=True, parent_id=parent_id)
         return [
             {
-                "id": str(cat.id),
-                "name": cat.name,
-                "image": cat.image.url if cat.image else "",
-                "slug": cat.slug,
-                "parent_id": str(cat.parent_id) if cat.parent_id else None,
+                "id": node["id"],
+                "name": node["name"],
+                "image": node["image"],
+                "slug": node["slug"],
+                "parent_id": node["parent_id"],
             }
-            for cat in qs
+            for node in get_tree().get_children(parent_id)
         ]
 
     # get_category_tree(parent_id=None) -> nested list
     def get_category_tree(self, parent_id: Optional[str] = None):
-        qs = Category.objects.filter(is_active=True, parent_id=parent_id).order_by("name")
-        out = []
-        for cat in qs:
-            out.append({
-                "id": str(cat.id),
-                "name": cat.name,
-                "englishName": cat.english_name,
-                "parent_id": str(cat.parent_id) if cat.parent_id else None,
-                "children": self.get_category_tree(parent_id=str(cat.id)),
-            })
-        return out
+        return get_tree().as_nested(parent_id)
+
+    # get_category_path(category_id) -> list (root first)
+    def get_category_path(self, category_id: str) -> List[Dict[str, Any]]:
+        return get_tree().ancestors(category_id)
+
+    # get_descendant_ids(category_id) -> set of ids (self included by default)
+    def get_descendant_ids(self, category_id: str, include_self: bool = True) -> Set[str]:
+        return get_tree().descendant_ids(category_id, include_self=include_self)
+
+    # get_flat_tree(max_depth=None) -> sliceable depth-first rows (single CTE query)
+    def get_flat_tree(self, max_depth: Optional[int] = None) -> FlatCategoryTree:
+        return FlatCategoryTree(max_depth=max_depth)
 
     # delete_category(category_id)
     def delete_category(self, category_id: str):
@@ -85,3 +89,4 @@ class ProductCategoryService:
             fields["english_name"] = english_name
         if fields:
             Category.objects.filter(id=category_id).update(**fields)
+            transaction.on_commit(bump_version)  # queryset.update() does not send post_save
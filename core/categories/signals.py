@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Category
+from .tree import bump_version
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_tree(sender, instance, **kwargs):
+    # bump after commit so other workers never rebuild from uncommitted rows
+    transaction.on_commit(bump_version)
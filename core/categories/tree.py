@@ -0,0 +1,121 @@
+"""
+In-memory category tree.
+
+Every active Category row is loaded with a single query and the parent -> children
+adjacency is built in Python. The result is kept per process and shared by all
+requests; a version stamp in the shared cache tells each gunicorn worker when its
+copy is stale (see categories.signals).
+"""
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from django.core.cache import cache
+
+from .models import Category
+
+VERSION_CACHE_KEY = "categories:tree:version"
+
+_lock = threading.Lock()
+_tree = None  # type: Optional[CategoryTree]
+
+
+class CategoryTree:
+    """Immutable snapshot of the active category hierarchy."""
+
+    def __init__(self, categories, version: str):
+        self.version = version
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[Optional[str], List[str]] = {}
+
+        # rows arrive ordered by name, so every children list is already sorted
+        for cat in categories:
+            node_id = str(cat.id)
+            parent_id = str(cat.parent_id) if cat.parent_id else None
+            self.nodes[node_id] = {
+                "id": node_id,
+                "name": cat.name,
+                "englishName": cat.english_name,
+                "slug": cat.slug,
+                "image": cat.image.url if cat.image else "",
+                "parent_id": parent_id,
+            }
+            self.children.setdefault(parent_id, []).append(node_id)
+
+    def get(self, category_id) -> Optional[Dict[str, Any]]:
+        return self.nodes.get(str(category_id))
+
+    def get_children(self, parent_id=None) -> List[Dict[str, Any]]:
+        key = str(parent_id) if parent_id else None
+        return [self.nodes[cid] for cid in self.children.get(key, [])]
+
+    def as_nested(self, parent_id=None) -> List[Dict[str, Any]]:
+        """Nested list of nodes below `parent_id` (roots when None)."""
+        return [
+            {
+                "id": node["id"],
+                "name": node["name"],
+                "englishName": node["englishName"],
+                "parent_id": node["parent_id"],
+                "children": self.as_nested(node["id"]),
+            }
+            for node in self.get_children(parent_id)
+        ]
+
+    def ancestors(self, category_id) -> List[Dict[str, Any]]:
+        """Path from the root down to (and including) `category_id`."""
+        path = []
+        node = self.get(category_id)
+        seen = set()
+        while node and node["id"] not in seen:
+            seen.add(node["id"])
+            path.append(node)
+            node = self.get(node["parent_id"]) if node["parent_id"] else None
+        path.reverse()
+        return path
+
+    def descendant_ids(self, category_id, include_self: bool = True) -> Set[str]:
+        root = str(category_id)
+        out = set()
+        stack = list(self.children.get(root, []))
+        while stack:
+            cid = stack.pop()
+            if cid in out or cid == root:
+                continue
+            out.add(cid)
+            stack.extend(self.children.get(cid, []))
+        if include_self and root in self.nodes:
+            out.add(root)
+        return out
+
+
+def current_version() -> str:
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        # first worker to ask seeds the stamp; everybody else reads it back
+        cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def bump_version():
+    """Mark every worker's copy of the tree as stale."""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def get_tree() -> CategoryTree:
+    """Return the process-wide tree, rebuilding it if the shared version moved."""
+    global _tree
+    version = current_version()
+    tree = _tree
+    if tree is not None and tree.version == version:
+        return tree
+
+    with _lock:
+        if _tree is None or _tree.version != version:
+            # read the stamp before the rows so a concurrent bump triggers another rebuild
+            _tree = CategoryTree(
+                Category.objects.filter(is_active=True).order_by("name"),
+                version=version,
+            )
+        return _tree
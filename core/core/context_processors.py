@@ -1,3 +1,8 @@
+import uuid
+
+from django.utils.functional import SimpleLazyObject
+
+
 def site_colors(request):
     return {
         "color_primary": "#1A237E",     # Deep Persian Blue
@@ -7,3 +12,8 @@ def site_colors(request):
         "color_text": "#212529",        # Text color
         "color_muted": "#e0e0e0",       # Muted gray
     }
+
+
+def idempotency_key(request):
+    # one fresh key per rendered page; forms echo it back (see core.idempotency)
+    return {"idempotency_key": SimpleLazyObject(lambda: uuid.uuid4().hex)}
@@ -0,0 +1,178 @@
+"""
+Idempotency keys for non-repeatable POSTs (checkout, cart changes).
+
+The client sends a key with the request — the `Idempotency-Key` header (API
+clients) or an `idempotency_key` form field (every template gets a fresh
+`{{ idempotency_key }}` from core.context_processors.idempotency_key). The
+first request with a key runs the view and its response is stored in the
+cache for IDEMPOTENCY_TTL seconds; a retry with the same key gets that
+response back without running the view again. A retry that arrives while
+the first is still running waits briefly, then gets 409.
+
+    @idempotent                         # function view
+    @method_decorator(idempotent, name="post")  # class-based view
+
+IdempotencyMiddleware applies the same to any unsafe request that carries the
+header. Requests without a key behave exactly as before.
+
+Keys are scoped to their owner: the logged-in user, the user of a JWT
+`Authorization` header (API clients; resolved here because DRF authenticates
+later), or the session. A request with none of these runs without a key.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+FIELD = "idempotency_key"
+TTL = 600
+WAIT_SECONDS = 3.0
+MAX_KEY_LENGTH = 128
+REPLAY_HEADERS = ("Content-Type", "Location")
+_IN_PROGRESS = "in-progress"
+
+
+def request_key(request):
+    key = request.META.get(HEADER) or request.POST.get(FIELD) or request.GET.get(FIELD)
+    if key and len(key) <= MAX_KEY_LENGTH:
+        return key
+    return None
+
+
+def _api_owner(request):
+    """
+    Owner of a request carrying an Authorization header. DRF authenticates in
+    the view, after this middleware, so the JWT is resolved here; a token that
+    does not resolve scopes the key to the header itself.
+    """
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        authenticated = None
+    if authenticated is not None:
+        return f"u{authenticated[0].pk}"
+    return "h" + hashlib.sha1(request.META["HTTP_AUTHORIZATION"].encode()).hexdigest()
+
+
+def _owner(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"u{user.pk}"
+    if request.META.get("HTTP_AUTHORIZATION"):
+        return _api_owner(request)
+    session = getattr(request, "session", None)
+    return f"s{session.session_key}" if session is not None and session.session_key else None
+
+
+def _fingerprint(request):
+    # same key with a different payload is a client bug, not a retry
+    if request.content_type == "multipart/form-data":
+        # the raw body carries a random boundary; compare the parsed fields instead
+        body = repr(sorted(request.POST.lists())).encode()
+    else:
+        body = request.body
+    return hashlib.sha1(request.method.encode() + request.get_full_path().encode() + body).hexdigest()
+
+
+def _store(response):
+    if response.streaming or response.status_code >= 500:
+        return None
+    return {
+        "status": response.status_code,
+        "content": response.content,
+        "headers": {h: response[h] for h in REPLAY_HEADERS if response.has_header(h)},
+    }
+
+
+def _replay(stored):
+    response = HttpResponse(stored["content"], status=stored["status"])
+    for header, value in stored["headers"].items():
+        response[header] = value
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def run_idempotent(request, key, call):
+    """Run call() once per (owner, path, key); retries get the stored response."""
+    owner = _owner(request)
+    if owner is None:
+        # no user, token or session: nothing to keep one client's key apart from another's
+        return call()
+    ttl = getattr(settings, "IDEMPOTENCY_TTL", TTL)
+    digest = hashlib.sha1(f"{owner}:{request.path}:{key}".encode()).hexdigest()
+    cache_key = f"idem:{digest}"
+    fingerprint = _fingerprint(request)
+
+    if not cache.add(cache_key, {"state": _IN_PROGRESS, "fingerprint": fingerprint}, ttl):
+        deadline = time.monotonic() + WAIT_SECONDS
+        while True:
+            entry = cache.get(cache_key)
+            if entry is None:
+                break  # the first attempt failed and released the key: run again
+            if entry["fingerprint"] != fingerprint:
+                return JsonResponse({"detail": "Idempotency-Key reused with a different request."}, status=422)
+            if entry["state"] != _IN_PROGRESS:
+                return _replay(entry["response"])
+            if time.monotonic() >= deadline:
+                response = JsonResponse({"detail": "A request with this Idempotency-Key is in progress."}, status=409)
+                response["Retry-After"] = "1"
+                return response
+            time.sleep(0.1)
+        if not cache.add(cache_key, {"state": _IN_PROGRESS, "fingerprint": fingerprint}, ttl):
+            return run_idempotent(request, key, call)
+
+    try:
+        response = call()
+        if getattr(response, "is_rendered", True) is False:
+            # TemplateResponse (class-based views): render now so the stored body is the real one
+            response.render()
+    except Exception:
+        cache.delete(cache_key)
+        raise
+    stored = _store(response)
+    if stored is None:
+        cache.delete(cache_key)
+    else:
+        cache.set(cache_key, {"state": "done", "fingerprint": fingerprint, "response": stored}, ttl)
+    return response
+
+
+def idempotent(view):
+    """View decorator: POSTs carrying an idempotency key run at most once per key."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # GET only counts with an explicit ?idempotency_key= (links that mutate, e.g. add-to-cart)
+        key = request_key(request)
+        if key is None:
+            return view(request, *args, **kwargs)
+        return run_idempotent(request, key, lambda: view(request, *args, **kwargs))
+    wrapper.idempotent = True
+    return wrapper
+
+
+class IdempotencyMiddleware:
+    """Honours the Idempotency-Key header on every unsafe request (views without @idempotent)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ("GET", "HEAD", "OPTIONS", "TRACE") or HEADER not in request.META:
+            return None
+        handler = getattr(getattr(view_func, "view_class", None), request.method.lower(), view_func)
+        if getattr(view_func, "idempotent", False) or getattr(handler, "idempotent", False):
+            return None  # the decorator handles it
+        key = request_key(request)
+        if key is None:
+            return None
+        return run_idempotent(request, key, lambda: view_func(request, *view_args, **view_kwargs))
@@ -0,0 +1,212 @@
+"""
+Keyset (cursor) pagination for the long, append-mostly lists.
+
+OFFSET pagination makes Postgres read and throw away every row before the
+requested page, so deep pages get slower as tables grow. Keyset pagination
+remembers the sort key of the last row shown and asks for rows "after" it,
+which a composite (sort_key, id) index answers directly at any depth.
+
+The position is handed to the client as an opaque, URL-safe token (?cursor=).
+Lists whose ordering is not the keyset ordering (e.g. ranked search results)
+fall back to the regular ?page= paginator, so templates must handle both;
+`page_obj.is_keyset` tells them apart.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from rest_framework.pagination import CursorPagination
+
+CURSOR_PARAM = "cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# =====================================
+# Cursor tokens
+# =====================================
+
+def encode_cursor(values, reverse=False) -> str:
+    """[key values] -> opaque token. reverse=True marks a "previous page" cursor."""
+    payload = {"v": [None if v is None else str(v) for v in values]}
+    if reverse:
+        payload["r"] = 1
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Opaque token -> ([raw key values], reverse). Raises InvalidCursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor(token)
+    if not isinstance(values, list):
+        raise InvalidCursor(token)
+    return values, bool(payload.get("r"))
+
+
+# =====================================
+# Paginator
+# =====================================
+
+class KeysetPage:
+    """Duck-types the bits of django.core.paginator.Page the templates use."""
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        # querystrings for the nav links, filled in by KeysetPaginationMixin
+        self.next_query = ""
+        self.previous_query = ""
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class KeysetPaginator:
+    """
+    Paginate `queryset` by `ordering`, e.g. ("-created_at", "-id").
+
+    The last ordering field must be unique (normally the pk) so that the key
+    is a total order. Fields must not be nullable.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [o.lstrip("-") for o in self.ordering]
+        self.descending = [o.startswith("-") for o in self.ordering]
+        model_fields = queryset.model._meta
+        self._model_fields = [model_fields.get_field(f) for f in self.fields]
+
+    # page(cursor) -> KeysetPage
+    def page(self, cursor=None):
+        reverse = False
+        qs = self.queryset.order_by(*self.ordering)
+        if cursor:
+            values, reverse = self._parse(cursor)
+            qs = qs.filter(self._after(values, reverse))
+            if reverse:
+                qs = qs.order_by(*self._flipped())
+
+        rows = list(qs[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = encode_cursor(self._key(rows[-1]))
+            if (has_more and reverse) or (cursor and not reverse):
+                previous_cursor = encode_cursor(self._key(rows[0]), reverse=True)
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    def _key(self, obj):
+        return [getattr(obj, f.attname) for f in self._model_fields]
+
+    def _parse(self, cursor):
+        values, reverse = decode_cursor(cursor)
+        if len(values) != len(self.fields) or None in values:
+            raise InvalidCursor(cursor)
+        try:
+            return [f.to_python(v) for f, v in zip(self._model_fields, values)], reverse
+        except ValidationError:
+            raise InvalidCursor(cursor)
+
+    def _flipped(self):
+        return [f if desc else f"-{f}" for f, desc in zip(self.fields, self.descending)]
+
+    def _after(self, values, reverse):
+        """
+        Rows strictly after `values` in the (possibly reversed) ordering:
+            (a < x) OR (a = x AND b < y) OR ...
+        The leading `a <= x` is redundant but gives the planner an index range.
+        """
+        cond = Q()
+        equal = {}
+        for field, desc, value in zip(self.fields, self.descending, values):
+            op = "lt" if desc != reverse else "gt"
+            cond |= Q(**equal, **{f"{field}__{op}": value})
+            equal[field] = value
+        first_op = "lte" if self.descending[0] != reverse else "gte"
+        return Q(**{f"{self.fields[0]}__{first_op}": values[0]}) & cond
+
+
+# =====================================
+# ListView integration
+# =====================================
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin: paginate by `keyset_ordering` with ?cursor= tokens.
+
+    get_queryset() should order by exactly `keyset_ordering`; any other
+    ordering (search relevance, ...) is paginated the usual way with ?page=.
+    """
+    keyset_ordering = ("-created_at", "-id")
+
+    def uses_keyset(self, queryset):
+        return tuple(queryset.query.order_by) == tuple(self.keyset_ordering)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset(queryset):
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(CURSOR_PARAM))
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        page.next_query = self._cursor_query(page.next_cursor)
+        page.previous_query = self._cursor_query(page.previous_cursor)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def _cursor_query(self, cursor):
+        if cursor is None:
+            return ""
+        params = self.request.GET.copy()
+        params.pop("page", None)
+        params[CURSOR_PARAM] = cursor
+        return params.urlencode()
+
+
+# =====================================
+# DRF
+# =====================================
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Newest first, opaque ?cursor= tokens. Opt-in per view (pagination_class) for
+    lists that are meant to be read in -created_at order; it replaces the
+    view's own ordering and drops `count` / ?page=.
+    """
+    ordering = ("-created_at", "-id")
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # 3rd party
     'rest_framework',
@@ -71,6 +72,9 @@ INSTALLED_APPS = [
     'frontend',
     'banners',
     'heroes',
+    'exports',
+    'inventory',
+    'renditions',
 ]
 
 MIDDLEWARE = [
@@ -81,6 +85,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # last, so CSRF/auth have run before a stored response is replayed
+    "core.idempotency.IdempotencyMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -97,6 +103,7 @@ TEMPLATES = [
                 "django.contrib.messages.context_processors.messages",
                 "django.template.context_processors.media",
                 "core.context_processors.site_colors",
+                "core.context_processors.idempotency_key",
             ],
         },
     },
@@ -192,6 +199,62 @@ REST_FRAMEWORK = {
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_BEAT_SCHEDULE = {
+    # keeps the admin dashboard snapshot warm (admin_dashboard.services)
+    'refresh-dashboard-metrics': {
+        'task': 'refresh_dashboard_metrics_task',
+        'schedule': 60.0,
+    },
+    'cleanup-export-jobs': {
+        'task': 'cleanup_export_jobs',
+        'schedule': 3600.0,
+    },
+    # checkouts whose gateway request never completed (orders.services)
+    'sweep-orphaned-orders': {
+        'task': 'sweep_orphaned_orders_task',
+        'schedule': 300.0,
+    },
+    # gives back stock held by checkouts that were never paid (inventory.services)
+    'expire-stock-reservations': {
+        'task': 'expire_stock_reservations_task',
+        'schedule': 60.0,
+    },
+    # verifies pending orders whose gateway callback never arrived
+    'reconcile-pending-orders': {
+        'task': 'reconcile_pending_orders_task',
+        'schedule': 300.0,
+    },
+}
+
+# background exports (exports app): how long finished files are kept
+EXPORT_JOB_TTL_HOURS = 24
+EXPORT_JOB_STALE_HOURS = 1
+
+# product list facets (products.facets): price band lower bounds and Product.features keys offered as filters
+FACET_PRICE_BOUNDS = (0, 5_000_000, 10_000_000, 20_000_000, 50_000_000)
+FACET_FEATURE_KEYS = ("عیار",)
+
+# admin media uploads (core.uploads): largest accepted file
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+# image renditions (renditions app): widths in px and encodings ("avif" where Pillow supports it)
+IMAGE_RENDITION_WIDTHS = (320, 640, 960, 1280, 1920)
+IMAGE_RENDITION_FORMATS = ("webp", "jpeg")
+
+# Shared cache (all gunicorn workers + celery see the same keys)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+    }
+}
+
+# share of seller revenue shown as net profit (products have no cost price yet)
+SELLER_PROFIT_RATE = 0.25
+
+# pg_trgm thresholds for the `%` / `<%` fuzzy lookups (see core/trigram.py)
+TRIGRAM_SIMILARITY_THRESHOLD = 0.3
+TRIGRAM_WORD_SIMILARITY_THRESHOLD = 0.5
 
 LOGIN_URL = '/login/'
 AUTH_USER_MODEL = 'accounts.User'
@@ -204,6 +267,24 @@ AUTHENTICATION_BACKENDS = [
 ZARINPAL_CALLBACK = "https://your-domain.com/api/orders/verify/"
 ZARINPAL_SUCCESS_URL = "https://your-domain.com/success/"
 ZARINPAL_FAIL_URL = "https://your-domain.com/failure/"
+ZARINPAL_MERCHANT_ID = config("ZARINPAL_MERCHANT_ID", default="your-merchant-id")
+ZARINPAL_SANDBOX = config("ZARINPAL_SANDBOX", default=True, cast=bool)
+# e.g. "http://127.0.0.1:8765/pg/v4" for `manage.py run_zarinpal_stub`
+ZARINPAL_BASE_URL = config("ZARINPAL_BASE_URL", default=None)
+ZARINPAL_CONNECT_TIMEOUT = 3.05
+ZARINPAL_READ_TIMEOUT = 10
+ZARINPAL_MAX_RETRIES = 2  # verify/inquiry only; payment requests are never retried
+# pending orders with no authority after this many minutes are failed by the sweeper
+ORPHAN_ORDER_MINUTES = 15
+# pending orders with an authority but no verified payment after this long are reconciled
+PAYMENT_RECONCILE_MINUTES = 20
+# how long checkout holds stock for an unpaid order
+STOCK_RESERVATION_MINUTES = 15
+# seconds a POST's response is kept for replay under its idempotency key (core.idempotency)
+IDEMPOTENCY_TTL = 600
+
+# TTF with Persian glyphs for PDF invoices (orders.invoices), e.g. static/fonts/Vazirmatn-Regular.ttf
+INVOICE_FONT_PATH = config("INVOICE_FONT_PATH", default="/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.example.com'
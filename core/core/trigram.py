@@ -0,0 +1,67 @@
+"""
+pg_trgm helpers shared by the admin/typeahead search paths.
+
+Fuzzy lookups go through the `%` (similarity) and `<%` (word similarity)
+operators, which the gin_trgm_ops indexes declared on the models can serve.
+Thresholds are per-session GUCs set once per DB connection from settings:
+
+    TRIGRAM_SIMILARITY_THRESHOLD       (default 0.3, pg_trgm's default)
+    TRIGRAM_WORD_SIMILARITY_THRESHOLD  (default 0.5)
+"""
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
+from django.db.backends.signals import connection_created
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from django.db.models.signals import pre_migrate
+from django.dispatch import receiver
+
+
+def similarity_threshold() -> float:
+    return float(getattr(settings, "TRIGRAM_SIMILARITY_THRESHOLD", 0.3))
+
+
+def word_similarity_threshold() -> float:
+    return float(getattr(settings, "TRIGRAM_WORD_SIMILARITY_THRESHOLD", 0.5))
+
+
+@receiver(connection_created)
+def apply_trigram_thresholds(sender, connection, **kwargs):
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.similarity_threshold', %s, false),"
+            " set_config('pg_trgm.word_similarity_threshold', %s, false)",
+            [str(similarity_threshold()), str(word_similarity_threshold())],
+        )
+
+
+@receiver(pre_migrate)
+def ensure_trigram_extension(sender, using="default", **kwargs):
+    # runs before any migration of any app, so the gin_trgm_ops indexes can be created
+    if getattr(sender, "name", None) != "products":
+        return
+    from django.db import connections
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+def fuzzy_filter(qs, q, fields, word=False):
+    """
+    Keep rows where any of `fields` fuzzily matches `q`, best matches first (`sim`).
+
+    word=False uses `field % q` (whole-string similarity, good for full names);
+    word=True uses `q <% field` (best matching word run, good for typeahead where
+    the user has typed only part of a long name). Both are GIN-index backed.
+    """
+    lookup = "trigram_word_similar" if word else "trigram_similar"
+    cond = Q()
+    scores = []
+    for field in fields:
+        cond |= Q(**{f"{field}__{lookup}": q})
+        scores.append(TrigramWordSimilarity(q, field) if word else TrigramSimilarity(field, q))
+    score = scores[0] if len(scores) == 1 else Greatest(*scores)
+    return qs.filter(cond).annotate(sim=score).order_by("-sim")
@@ -0,0 +1,95 @@
+"""
+Content-addressed media uploads.
+
+store_upload() files an uploaded file under its SHA-256:
+
+    <prefix>/<first 2 hex>/<sha256>.<ext>      e.g. products/3f/3fa9…c1.jpg
+
+so the same image uploaded twice is stored once and its URL never changes.
+The upload is read in CHUNK_SIZE pieces (Django has already spooled large
+uploads to a temp file): one pass hashes it, a second streams it to storage
+only when that content is new. Memory per upload stays at one chunk.
+
+Limits are checked before the body is read: the declared size against
+UPLOAD_MAX_BYTES, and the type from the file's first bytes (the client's
+filename and Content-Type are not trusted). Rejections raise UploadRejected
+with a message that can be shown to the admin.
+"""
+import hashlib
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.template.defaultfilters import filesizeformat
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+# type -> extension, detected from the leading bytes
+IMAGE_TYPES = {"jpeg": "jpg", "png": "png", "gif": "gif", "webp": "webp"}
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    name: str      # storage name
+    url: str
+    size: int
+    sha256: str
+    created: bool  # False when identical content was already stored
+
+
+def sniff_type(head: bytes):
+    """Image type from the first bytes of a file, or None."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _max_bytes():
+    return getattr(settings, "UPLOAD_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+
+def _hash(f, max_bytes):
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in f.chunks(CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:  # the declared size was wrong
+            raise UploadRejected(f"حجم فایل «{f.name}» بیش از حد مجاز است.")
+        digest.update(chunk)
+    return digest.hexdigest(), size
+
+
+def store_upload(f, prefix, allowed=IMAGE_TYPES, max_bytes=None) -> StoredUpload:
+    """Store the UploadedFile `f` under <prefix>/ by content hash (see module docstring)."""
+    max_bytes = max_bytes or _max_bytes()
+    if f.size is not None and f.size > max_bytes:
+        raise UploadRejected(f"حجم فایل «{f.name}» بیش از {filesizeformat(max_bytes)} است.")
+
+    f.seek(0)
+    kind = sniff_type(f.read(16))
+    if kind not in allowed:
+        raise UploadRejected(f"نوع فایل «{f.name}» مجاز نیست.")
+
+    sha256, size = _hash(f, max_bytes)
+    name = f"{prefix.strip('/')}/{sha256[:2]}/{sha256}.{allowed[kind]}"
+    created = False
+    if not default_storage.exists(name):
+        f.seek(0)
+        saved = default_storage.save(name, f)  # Storage.save streams f.chunks()
+        if saved != name:
+            # the same content was stored concurrently under `name`: keep that copy
+            default_storage.delete(saved)
+        else:
+            created = True
+    return StoredUpload(name=name, url=default_storage.url(name), size=size, sha256=sha256, created=created)
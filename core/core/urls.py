@@ -21,6 +21,7 @@ urlpatterns = [
     path('writer/', include('writer_dashboard.urls')),
     path('seller/', include('seller_dashboard.urls', namespace='seller')),
     path('customer/', include('customer_dashboard.urls')),
+    path('exports/', include('exports.urls')),
 
     # ✅ FRONTEND PAGES
     path('', include('frontend.urls')),
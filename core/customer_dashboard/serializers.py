@@ -24,15 +24,15 @@ class NotificationSerializer(serializers.ModelSerializer):
 class CartItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
-        fields = '__all__'
+        fields = ['id', 'product', 'product_name', 'quantity', 'unit_price', 'line_total']
 
 
 class OrderSummarySerializer(serializers.ModelSerializer):
-    items = CartItemSerializer(many=True, source='orderitem_set')
+    items = CartItemSerializer(many=True)
 
     class Meta:
         model = Order
-        fields = ['id', 'customer', 'status', 'created_at', 'items']
+        fields = ['id', 'user', 'status', 'created_at', 'total_price', 'item_count', 'items']
 
 
 class SupportTicketSerializer(serializers.ModelSerializer):
@@ -1,9 +1,11 @@
 from django.views import View
 from django.shortcuts import render
-from reportlab.pdfgen import canvas
+from django.core.files.storage import default_storage
 from orders.models import OrderItem
-from django.http import HttpResponse
-from orders.models import Order, CartItem
+from django.http import FileResponse
+from orders.models import Order
+from orders.cart import CartService
+from orders.invoices import get_invoice
 from products.models.product import Product
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -34,7 +36,7 @@ class ProfilePage(LoginRequiredMixin, View):
 class RecommendedProductsPage(LoginRequiredMixin, View):
     def get(self, request):
         ordered_ids = OrderItem.objects.values_list('product_id', flat=True)
-        recommended = Product.objects.filter(id__in=ordered_ids).distinct()[:10]
+        recommended = Product.objects.cards().filter(id__in=ordered_ids).distinct()[:10]
         return render(request, "customer_dashboard/recommended.html", {"recommended": recommended})
 
 
@@ -46,7 +48,7 @@ class WishlistPage(LoginRequiredMixin, View):
 
 class CartPage(LoginRequiredMixin, View):
     def get(self, request):
-        cart_items = CartItem.objects.filter(user=request.user)
+        cart_items = CartService.for_user(request.user).lines()
         return render(request, "customer_dashboard/cart.html", {"cart_items": cart_items})
 
 
@@ -78,23 +80,8 @@ class InvoicePage(LoginRequiredMixin, View):
         except Order.DoesNotExist:
             return render(request, "customer_dashboard/invoice_error.html", {"order_id": order_id})
 
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="invoice_{order_id}.pdf"'
-
-        p = canvas.Canvas(response)
-        p.setFont("Helvetica", 12)
-        p.drawString(100, 800, f"Invoice for Order #{order.id}")
-        p.drawString(100, 780, f"Date: {order.created_at.strftime('%Y-%m-%d')}")
-        p.drawString(100, 760, f"Status: {order.status}")
-        p.drawString(100, 740, "Items:")
-
-        y = 720
-        for item in order.orderitem_set.all():
-            p.drawString(120, y, f"{item.product.title} x {item.quantity} @ {item.price} each")
-            y -= 20
-
-        p.drawString(100, y - 20, "Thank you for your purchase!")
-        p.showPage()
-        p.save()
-        return response
+        # cached per order version; usually pre-rendered when the order was paid
+        path = get_invoice(order)
+        return FileResponse(default_storage.open(path, "rb"), content_type="application/pdf",
+                            filename=f"invoice_{order_id}.pdf")
 
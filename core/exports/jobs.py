@@ -0,0 +1,73 @@
+"""
+Export kinds that can run as background jobs.
+
+A builder takes the ExportJob and returns an ExportSpec: the download file
+name, the Sheets to write (rows may be lazy iterators) and the total row
+count used for progress. Register builders with @register("<kind>").
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List
+
+from blogs.models.blog import Blog
+from core.exports import Sheet, queryset_rows
+from news.models.news import News
+
+FORMATS = ("csv", "xlsx")
+
+
+@dataclass
+class ExportSpec:
+    filename: str  # without extension
+    sheets: List[Sheet]
+    total_rows: int
+
+
+BUILDERS: Dict[str, Callable] = {}
+
+
+def register(kind):
+    def decorator(func):
+        BUILDERS[kind] = func
+        return func
+    return decorator
+
+
+def build(job) -> ExportSpec:
+    try:
+        builder = BUILDERS[job.kind]
+    except KeyError:
+        raise ValueError(f"Unknown export kind: {job.kind}")
+    return builder(job)
+
+
+@register("seller_report")
+def seller_report(job):
+    from seller_dashboard import analytics
+    from seller_dashboard.utils import report_sheets
+
+    start = date.fromisoformat(job.params["start"])
+    end = date.fromisoformat(job.params["end"])
+    payload = analytics.export_payload(analytics.get_summary_data(job.user, start, end))
+    total = len(payload["summary"]) + len(payload["top_products"]) + len(payload["low_stock_products"])
+    return ExportSpec(
+        filename=f"seller-report-{job.user.phone_number}-{start}-{end}",
+        sheets=report_sheets(payload),
+        total_rows=total,
+    )
+
+
+@register("writer_content")
+def writer_content(job):
+    fields = ["id", "name", "publish_time", "read_time"]
+    header = ["ID", "Name", "Publish Time", "Read Time"]
+    blogs = Blog.objects.filter(writer=job.user).order_by("id")
+    news = News.objects.filter(writer=job.user).order_by("id")
+    return ExportSpec(
+        filename="writer_content",
+        sheets=[
+            Sheet("Blogs", header, queryset_rows(blogs, fields)),
+            Sheet("News", header, queryset_rows(news, fields)),
+        ],
+        total_rows=blogs.count() + news.count(),
+    )
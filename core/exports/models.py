@@ -0,0 +1,60 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class ExportJob(models.Model):
+    """
+    One background export (exports.tasks.run_export_job).
+
+    `fingerprint` identifies (user, kind, params); at most one pending/running
+    job may exist per fingerprint, so repeated clicks share a single job.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'در صف'),
+        (STATUS_RUNNING, 'در حال ساخت'),
+        (STATUS_DONE, 'آماده'),
+        (STATUS_FAILED, 'ناموفق'),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=64)
+    params = models.JSONField(default=dict, blank=True)
+    fingerprint = models.CharField(max_length=64)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    progress = models.PositiveSmallIntegerField(default=0)  # 0..100
+    file = models.FileField(upload_to='exports/', blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fingerprint'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='exportjob_active_fingerprint',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='exportjob_status_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} ({self.status}) for {self.user_id}"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
@@ -0,0 +1,42 @@
+import hashlib
+import json
+
+from django.db import IntegrityError, transaction
+
+from .jobs import BUILDERS, FORMATS
+from .models import ExportJob
+
+
+def fingerprint(user_id, kind, params) -> str:
+    raw = json.dumps([user_id, kind, params], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def start_export(user, kind, params, fmt="xlsx"):
+    """
+    Queue an export and return its ExportJob.
+
+    An identical request (same user, kind, params and format) that is still
+    pending/running returns the existing job instead of starting another;
+    the partial unique index on fingerprint settles concurrent clicks.
+    """
+    if kind not in BUILDERS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    params = {**params, "format": fmt}
+    fp = fingerprint(user.pk, kind, params)
+
+    for _ in range(2):
+        existing = ExportJob.objects.filter(fingerprint=fp, status__in=ExportJob.ACTIVE_STATUSES).first()
+        if existing:
+            return existing
+        try:
+            with transaction.atomic():
+                job = ExportJob.objects.create(user=user, kind=kind, params=params, fingerprint=fp)
+        except IntegrityError:
+            continue  # lost the race: the other request's job is active now
+        from .tasks import run_export_job
+        transaction.on_commit(lambda: run_export_job.delay(str(job.pk)))
+        return job
+    raise RuntimeError("Could not queue export job")
@@ -0,0 +1,85 @@
+import tempfile
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from core.exports import write_csv, write_xlsx
+from .jobs import build
+from .models import ExportJob
+
+PROGRESS_STEP = 1000  # rows between progress writes
+
+
+def job_ttl():
+    return timedelta(hours=getattr(settings, "EXPORT_JOB_TTL_HOURS", 24))
+
+
+def _tracked(sheets, job_id, total):
+    """Wrap each sheet's rows so progress is written every PROGRESS_STEP rows."""
+    done = 0
+
+    def counted(rows):
+        nonlocal done
+        for row in rows:
+            yield row
+            done += 1
+            if total and done % PROGRESS_STEP == 0:
+                ExportJob.objects.filter(pk=job_id).update(progress=min(99, done * 100 // total))
+
+    for sheet in sheets:
+        sheet.rows = counted(sheet.rows)
+    return sheets
+
+
+@shared_task(name="run_export_job")
+def run_export_job(job_id):
+    # claim the job; a duplicate delivery of the same message finds it no longer pending
+    claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_PENDING).update(
+        status=ExportJob.STATUS_RUNNING, started_at=timezone.now(),
+    )
+    if not claimed:
+        return
+    job = ExportJob.objects.select_related("user").get(pk=job_id)
+    fmt = job.params.get("format", "xlsx")
+
+    try:
+        spec = build(job)
+        sheets = _tracked(spec.sheets, job.pk, spec.total_rows)
+        with tempfile.TemporaryFile() as tmp:
+            (write_xlsx if fmt == "xlsx" else write_csv)(sheets, tmp)
+            tmp.seek(0)
+            filename = f"{spec.filename}.{fmt}"
+            job.file.save(f"{job.user_id}/{job.pk}.{fmt}", File(tmp), save=False)
+    except Exception as e:
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.STATUS_FAILED, error=str(e)[:2000],
+            finished_at=timezone.now(), expires_at=timezone.now() + job_ttl(),
+        )
+        raise
+
+    now = timezone.now()
+    ExportJob.objects.filter(pk=job.pk).update(
+        status=ExportJob.STATUS_DONE, progress=100, file=job.file.name, filename=filename,
+        finished_at=now, expires_at=now + job_ttl(),
+    )
+
+
+@shared_task(name="cleanup_export_jobs")
+def cleanup_export_jobs():
+    """Delete expired jobs (and their files); fail jobs whose worker died mid-run."""
+    now = timezone.now()
+    stale = now - timedelta(hours=getattr(settings, "EXPORT_JOB_STALE_HOURS", 1))
+    ExportJob.objects.filter(status__in=ExportJob.ACTIVE_STATUSES, created_at__lt=stale).update(
+        status=ExportJob.STATUS_FAILED, error="timed out", finished_at=now, expires_at=now,
+    )
+
+    removed = 0
+    for job in ExportJob.objects.filter(expires_at__lt=now).exclude(status__in=ExportJob.ACTIVE_STATUSES).iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        removed += 1
+    return removed
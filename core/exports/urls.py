@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = "exports"
+
+urlpatterns = [
+    path("<uuid:pk>/", views.export_job_detail, name="job_detail"),
+    path("<uuid:pk>/status/", views.export_job_status, name="job_status"),
+    path("<uuid:pk>/download/", views.export_job_download, name="job_download"),
+]
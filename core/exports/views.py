@@ -0,0 +1,42 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+
+from .models import ExportJob
+
+
+def _user_job(request, pk):
+    return get_object_or_404(ExportJob, pk=pk, user=request.user)
+
+
+def job_payload(job):
+    return {
+        "id": str(job.pk),
+        "status": job.status,
+        "progress": job.progress,
+        "filename": job.filename,
+        "error": job.error if job.status == ExportJob.STATUS_FAILED else "",
+        "download_url": reverse("exports:job_download", args=[job.pk]) if job.status == ExportJob.STATUS_DONE else None,
+    }
+
+
+@login_required
+def export_job_detail(request, pk):
+    """Progress page; polls export_job_status until the file is ready."""
+    job = _user_job(request, pk)
+    return render(request, "exports/job_detail.html", {"job": job, "job_data": job_payload(job)})
+
+
+@login_required
+def export_job_status(request, pk):
+    return JsonResponse(job_payload(_user_job(request, pk)))
+
+
+@login_required
+def export_job_download(request, pk):
+    # the file is served from MEDIA storage, not streamed through this worker
+    job = _user_job(request, pk)
+    if job.status != ExportJob.STATUS_DONE or not job.file:
+        raise Http404
+    return redirect(job.file.url)
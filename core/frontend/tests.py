@@ -1,3 +1,35 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from orders.cart import CartService
+from products.models.product import Product
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CartPageTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.product = Product.objects.create(
+            name="انگشتر", english_name="ring", price=12000, owner_name="o", owner_profile="http://x",
+            short_description="s", description="d", view_image="x.jpg",
+        )
+
+    def test_anonymous_add_to_cart_shows_the_cart(self):
+        response = self.client.get(reverse("add_to_cart", args=[self.product.pk]), follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "orders/cart.html")
+        self.assertContains(response, "انگشتر")
+
+    def test_customer_dashboard_cart_lists_the_items(self):
+        user = get_user_model().objects.create_user(phone_number="09120000003", password="x")
+        with mock.patch("orders.tasks.persist_cart_task.apply_async"):  # no broker in tests
+            CartService.for_user(user).add(self.product.pk, 2)
+        self.client.force_login(user)
+        response = self.client.get(reverse("frontend_cart"))
+        self.assertContains(response, "انگشتر - 2 عدد")
@@ -1,4 +1,6 @@
 from django.views.generic import TemplateView
+from django.contrib import messages
+from django.http import Http404
 from django.shortcuts import redirect, render, get_object_or_404
 from news.models.news import News
 from blogs.models.blog import Blog
@@ -6,7 +8,10 @@ from banners.models import Banner
 from heroes.models import Hero
 from products.models.product import Product
 from products.models.brand import Brand
+from products.read_model import get_product_detail
 from categories.services import ProductCategoryService
+from orders.cart import CartService
+from core.idempotency import idempotent
 
 
 def home(request):
@@ -19,7 +24,7 @@ def home(request):
         "middle_banner": Banner.objects.filter(is_active=True, position="middle").last(),
         "bottom_banners": Banner.objects.filter(is_active=True, position="bottom").order_by("priority"),
         "categories": categories,
-        "featured_products": Product.objects.filter(featured=True)[:8],
+        "featured_products": Product.objects.cards().filter(is_active=True, featured=True).order_by("-created_at")[:8],
         "brands": Brand.objects.all(),
     })
 
@@ -29,14 +34,18 @@ def profile(request):
 
 
 def cart(request):
-    return render(request, "cart.html")
+    cart = CartService.for_request(request, create=False)
+    items = cart.lines() if cart else []
+    return render(request, "orders/cart.html", {"items": items, "total_price": CartService.total_price(items)})
 
 
+@idempotent
 def add_to_cart(request, id):
-    product = get_object_or_404(Product, id=id)
-    # Here you'd add logic to store product in session or user's cart
-    # For now just print a debug message or redirect
-    print(f"🛒 Adding product {product.name} to cart.")
+    # works for anonymous visitors too (session cart, merged into the account at login)
+    if not Product.objects.filter(id=id, is_active=True).exists():
+        raise Http404
+    CartService.for_request(request).add(id, 1)
+    messages.success(request, "آیتم به سبد اضافه شد.")
     return redirect("cart")
 
 
@@ -75,8 +84,10 @@ def notifications(request):
 
 
 def product_detail(request, id):
-    product = get_object_or_404(Product, id=id)
-    return render(request, "product_detail.html", {"product": product})
+    product = get_product_detail(id)
+    if product is None:
+        raise Http404("Product not found")
+    return render(request, "products/product_detail.html", {"product": product})
 
 
 def product_list(request):
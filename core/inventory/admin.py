@@ -0,0 +1,67 @@
+from django import forms
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+
+from . import services
+from .models import StockLevel, StockReservation
+
+
+class StockLevelForm(forms.ModelForm):
+    # `available` as the admin saw it when the page loaded: the edit is applied as the
+    # difference from this, so checkouts that reserved stock since then are kept
+    seen_available = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    class Meta:
+        model = StockLevel
+        exclude = ('reserved',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.fields['seen_available'].initial = self.instance.available
+            self.fields['seen_available'].required = True
+
+    def delta(self):
+        """Units to add (> 0) or write off (< 0)."""
+        return self.cleaned_data['available'] - self.cleaned_data['seen_available']
+
+    def clean(self):
+        cleaned = super().clean()
+        if self.instance.pk is None or 'available' not in cleaned or cleaned.get('seen_available') is None:
+            return cleaned
+        delta = self.delta()
+        current = StockLevel.objects.filter(pk=self.instance.pk).values_list('available', flat=True).first() or 0
+        if delta < 0 and current < -delta:
+            self.add_error('available', f"فقط {current} عدد موجود است؛ کسر {-delta} عدد ممکن نیست.")
+        return cleaned
+
+
+@admin.register(StockLevel)
+class StockLevelAdmin(admin.ModelAdmin):
+    form = StockLevelForm
+    list_display = ('product', 'available', 'reserved', 'low_stock_threshold', 'updated_at')
+    raw_id_fields = ('product',)
+    readonly_fields = ('reserved',)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # apply the edit as a delta so concurrent checkouts are not overwritten
+        delta = form.delta()
+        if not services.adjust_stock(obj.product_id, delta):
+            # reserved between clean() and here
+            obj._stock_not_adjusted = True
+            messages.error(request, f"موجودی کافی نبود؛ کسر {-delta} عدد انجام نشد.")
+        StockLevel.objects.filter(pk=obj.pk).update(low_stock_threshold=obj.low_stock_threshold)
+
+    def response_change(self, request, obj):
+        if getattr(obj, '_stock_not_adjusted', False):
+            return HttpResponseRedirect(request.path)  # back to the form, without the "changed" message
+        return super().response_change(request, obj)
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('order', 'product', 'quantity', 'status', 'expires_at')
+    list_filter = ('status',)
+    raw_id_fields = ('order', 'product')
@@ -0,0 +1,55 @@
+from django.db import models
+
+from orders.models import Order
+from products.models.product import Product
+
+
+class StockLevel(models.Model):
+    """
+    Stock counters of one product (products without a row are not stock-tracked).
+
+    `available` is what can still be sold; `reserved` is held by unpaid orders
+    (StockReservation). available + reserved = units on the shelf. Both only
+    change through inventory.services with single conditional UPDATEs.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='stock')
+    available = models.PositiveIntegerField(default=0)
+    reserved = models.PositiveIntegerField(default=0)
+    low_stock_threshold = models.PositiveIntegerField(default=5)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # low-stock lists only ever scan the (few) rows at or under their threshold
+            models.Index(fields=['available'], name='stock_low_idx',
+                         condition=models.Q(available__lte=models.F('low_stock_threshold'))),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.available} (+{self.reserved} reserved)"
+
+
+class StockReservation(models.Model):
+    STATUS_HELD = 'held'
+    STATUS_COMMITTED = 'committed'
+    STATUS_RELEASED = 'released'
+    STATUS_BACKORDERED = 'backordered'  # paid after release, and the stock was gone by then
+    STATUS_CHOICES = [
+        (STATUS_HELD, 'Held'),
+        (STATUS_COMMITTED, 'Committed'),
+        (STATUS_RELEASED, 'Released'),
+        (STATUS_BACKORDERED, 'Backordered'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_HELD)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='stock_resv_held_expiry_idx',
+                         condition=models.Q(status='held')),
+        ]
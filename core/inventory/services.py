@@ -0,0 +1,154 @@
+"""
+Stock reservation at checkout, without locks held across requests.
+
+    reserve(lines)                -> {product_id: qty} taken, or OutOfStock
+    hold_for_order(order, taken)  -> StockReservation rows (status "held")
+    commit_order(order)           order paid: reserved units leave the shelf
+    release_order(order)          order failed: units go back to `available`
+    expire_reservations()         celery beat: releases holds past expires_at
+
+Every counter change is one conditional UPDATE in autocommit
+(`available = available - n WHERE available >= n`), so a hot product's row is
+locked for a single statement, never for a whole checkout, and stock can't go
+negative however many buyers race for the last unit. The order transaction
+only inserts reservation rows, which nobody else contends on.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from orders.models import Order
+
+from .models import StockLevel, StockReservation
+
+RESERVATION_MINUTES = 15
+SOLD_STATUSES = ("paid", "sent", "delivered")
+LOW_STOCK_LIMIT = 50
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_ids):
+        super().__init__(f"Not enough stock for products {sorted(product_ids)}")
+        self.product_ids = list(product_ids)
+
+
+def _take(product_id, quantity):
+    """available -> reserved, only if enough is available. -> bool"""
+    return bool(StockLevel.objects.filter(product_id=product_id, available__gte=quantity).update(
+        available=F("available") - quantity, reserved=F("reserved") + quantity,
+    ))
+
+
+def _give_back(product_id, quantity):
+    StockLevel.objects.filter(product_id=product_id, reserved__gte=quantity).update(
+        available=F("available") + quantity, reserved=F("reserved") - quantity,
+    )
+
+
+def reserve(lines):
+    """
+    Take stock for cart lines ({product_id: quantity} or objects with .product/.quantity).
+    Untracked products (no StockLevel) are skipped. All-or-nothing: on a
+    shortage everything taken so far is given back and OutOfStock is raised.
+    Must run outside a transaction so each UPDATE commits (and unlocks) at once.
+    """
+    wanted = lines if isinstance(lines, dict) else {l.product.pk: l.quantity for l in lines}
+    tracked = set(StockLevel.objects.filter(product_id__in=wanted).values_list("product_id", flat=True))
+    taken = {}
+    # fixed order: two carts with the same products never wait on each other crosswise
+    for product_id in sorted(tracked):
+        if not _take(product_id, wanted[product_id]):
+            for pid, qty in taken.items():
+                _give_back(pid, qty)
+            raise OutOfStock([product_id])
+        taken[product_id] = wanted[product_id]
+    return taken
+
+
+def give_back(taken):
+    """Undo reserve() when the order could not be created."""
+    for product_id, quantity in taken.items():
+        _give_back(product_id, quantity)
+
+
+def hold_for_order(order, taken):
+    minutes = getattr(settings, "STOCK_RESERVATION_MINUTES", RESERVATION_MINUTES)
+    expires_at = timezone.now() + timedelta(minutes=minutes)
+    return StockReservation.objects.bulk_create([
+        StockReservation(order=order, product_id=pid, quantity=qty, expires_at=expires_at)
+        for pid, qty in taken.items()
+    ])
+
+
+def _transition(reservation_qs, to_status):
+    """Claim reservations one by one with a conditional UPDATE; yields the ones this call moved."""
+    for r in list(reservation_qs.only("pk", "product_id", "quantity", "status")):
+        if StockReservation.objects.filter(pk=r.pk, status=r.status).update(status=to_status):
+            yield r
+
+
+def commit_order(order):
+    """Order paid: held units are sold. Holds that already expired are re-taken if stock allows."""
+    for r in _transition(order.stock_reservations.filter(status=StockReservation.STATUS_HELD),
+                         StockReservation.STATUS_COMMITTED):
+        StockLevel.objects.filter(product_id=r.product_id, reserved__gte=r.quantity).update(
+            reserved=F("reserved") - r.quantity,
+        )
+    for r in order.stock_reservations.filter(status=StockReservation.STATUS_RELEASED):
+        taken = StockLevel.objects.filter(product_id=r.product_id, available__gte=r.quantity).update(
+            available=F("available") - r.quantity,
+        )
+        status = StockReservation.STATUS_COMMITTED if taken else StockReservation.STATUS_BACKORDERED
+        StockReservation.objects.filter(pk=r.pk, status=StockReservation.STATUS_RELEASED).update(status=status)
+
+
+def release_order(order):
+    """Order failed/cancelled: its held units become available again."""
+    for r in _transition(order.stock_reservations.filter(status=StockReservation.STATUS_HELD),
+                         StockReservation.STATUS_RELEASED):
+        _give_back(r.product_id, r.quantity)
+
+
+def expire_reservations(batch_size=500):
+    """
+    Release holds whose payment window passed; the order itself stays pending
+    for payment reconciliation. Holds of orders that did get paid (their
+    on_commit hook never ran) are committed instead. -> count released
+    """
+    expired = list(
+        StockReservation.objects
+        .filter(status=StockReservation.STATUS_HELD, expires_at__lt=timezone.now())
+        .order_by("expires_at")
+        .values_list("pk", "order_id", "order__status")[:batch_size]
+    )
+    for order_id in {order_id for _, order_id, status in expired if status in SOLD_STATUSES}:
+        commit_order(Order(pk=order_id))
+    unpaid = [pk for pk, _, status in expired if status not in SOLD_STATUSES]
+    released = 0
+    for r in _transition(StockReservation.objects.filter(pk__in=unpaid, status=StockReservation.STATUS_HELD),
+                         StockReservation.STATUS_RELEASED):
+        _give_back(r.product_id, r.quantity)
+        released += 1
+    return released
+
+
+def adjust_stock(product_id, delta):
+    """Restock (delta > 0) or write off (delta < 0) without overwriting concurrent reservations."""
+    if delta >= 0:
+        StockLevel.objects.filter(product_id=product_id).update(available=F("available") + delta)
+        return True
+    return bool(StockLevel.objects.filter(product_id=product_id, available__gte=-delta).update(
+        available=F("available") + delta,
+    ))
+
+
+def low_stock(queryset=None, limit=LOW_STOCK_LIMIT):
+    """StockLevel rows at or under their threshold (served by the stock_low_idx partial index)."""
+    qs = queryset if queryset is not None else StockLevel.objects.all()
+    return (
+        qs.filter(available__lte=F("low_stock_threshold"))
+        .select_related("product")
+        .order_by("available")[:limit]
+    )
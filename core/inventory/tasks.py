@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .services import expire_reservations
+
+
+@shared_task(name="expire_stock_reservations_task")
+def expire_stock_reservations_task():
+    return expire_reservations()
@@ -0,0 +1,142 @@
+import threading
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import path, reverse
+from django.utils import timezone
+
+from orders.models import Order
+from products.models.product import Product
+
+from . import services
+from .models import StockLevel, StockReservation
+
+
+def make_product(**kwargs):
+    return Product.objects.create(
+        name="انگشتر", english_name="ring", price=12000, owner_name="o", owner_profile="http://x",
+        short_description="s", description="d", **kwargs,
+    )
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    def test_concurrent_buyers_never_oversell(self):
+        product = make_product()
+        StockLevel.objects.create(product=product, available=10)
+        results = []
+
+        def buy():
+            try:
+                services.reserve({product.pk: 1})
+                results.append(True)
+            except services.OutOfStock:
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy) for _ in range(30)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stock = StockLevel.objects.get(pk=product.pk)
+        self.assertEqual(results.count(True), 10)
+        self.assertEqual((stock.available, stock.reserved), (0, 10))
+
+    def test_shortage_gives_back_what_was_taken(self):
+        a, b = make_product(), make_product()
+        StockLevel.objects.create(product=a, available=5)
+        StockLevel.objects.create(product=b, available=1)
+        with self.assertRaises(services.OutOfStock):
+            services.reserve({a.pk: 2, b.pk: 2})
+        self.assertEqual(StockLevel.objects.get(pk=a.pk).available, 5)
+        self.assertEqual(StockLevel.objects.get(pk=b.pk).available, 1)
+
+
+class ReservationExpiryTests(TestCase):
+    def setUp(self):
+        self.product = make_product()
+        StockLevel.objects.create(product=self.product, available=10)
+        self.user = get_user_model().objects.create_user(phone_number="09120000010", password="x")
+
+    def held_order(self, quantity, status="pending"):
+        order = Order.objects.create(user=self.user, total_price=1, address="a", status=status)
+        services.hold_for_order(order, services.reserve({self.product.pk: quantity}))
+        order.stock_reservations.update(expires_at=timezone.now() - timedelta(minutes=1))
+        return order
+
+    def stock(self):
+        stock = StockLevel.objects.get(pk=self.product.pk)
+        return stock.available, stock.reserved
+
+    def test_unpaid_holds_are_released(self):
+        order = self.held_order(3)
+        self.assertEqual(self.stock(), (7, 3))
+        self.assertEqual(services.expire_reservations(), 1)
+        self.assertEqual(self.stock(), (10, 0))
+        self.assertEqual(order.stock_reservations.get().status, StockReservation.STATUS_RELEASED)
+        self.assertEqual(services.expire_reservations(), 0)
+
+    def test_paid_holds_are_committed(self):
+        order = self.held_order(3, status="paid")
+        self.assertEqual(services.expire_reservations(), 0)
+        self.assertEqual(self.stock(), (7, 0))
+        self.assertEqual(order.stock_reservations.get().status, StockReservation.STATUS_COMMITTED)
+
+    def test_late_payment_retakes_stock(self):
+        order = self.held_order(3)
+        services.expire_reservations()
+        services.commit_order(order)
+        self.assertEqual(self.stock(), (7, 0))
+        self.assertEqual(order.stock_reservations.get().status, StockReservation.STATUS_COMMITTED)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AdjustStockTests(TestCase):
+    def setUp(self):
+        self.product = make_product()
+        StockLevel.objects.create(product=self.product, available=5)
+        admin_user = get_user_model().objects.create_superuser(phone_number="09120000011", password="x")
+        self.client.force_login(admin_user)
+        self.url = reverse("admin:inventory_stocklevel_change", args=[self.product.pk])
+
+    def stock(self):
+        stock = StockLevel.objects.get(pk=self.product.pk)
+        return stock.available, stock.reserved
+
+    def edit(self, available):
+        """Load the change form, let a checkout reserve 4 units, then submit `available`."""
+        page = self.client.get(self.url)
+        form = page.context["adminform"].form
+        data = {name: form[name].value() for name in form.fields}  # what the page posts back
+        data["available"] = available
+        services.reserve({self.product.pk: 4})
+        return self.client.post(self.url, data)
+
+    def test_write_off_beyond_available_is_refused(self):
+        response = self.edit(2)  # the admin saw 5: write off 3, but only 1 is left
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("available", response.context["adminform"].form.errors)
+        self.assertEqual(self.stock(), (1, 4))
+
+    def test_restock_keeps_the_concurrent_reservation(self):
+        response = self.edit(7)  # the admin saw 5: add 2
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.stock(), (3, 4))
+
+    def test_write_off_within_available(self):
+        response = self.edit(4)  # the admin saw 5: write off 1
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.stock(), (0, 4))
+
+    def test_adjust_stock_refuses_a_write_off_beyond_available(self):
+        services.reserve({self.product.pk: 4})
+        self.assertFalse(services.adjust_stock(self.product.pk, -3))
+        self.assertEqual(self.stock(), (1, 4))
+
+
+urlpatterns = [path("admin/", admin.site.urls)]
@@ -10,5 +10,10 @@ class AdminActionLog(models.Model):
     details = models.TextField(blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='adminlog_timestamp_keyset_idx'),
+        ]
+
     def __str__(self):
         return f"{self.admin.username} - {self.action} at {self.timestamp}"
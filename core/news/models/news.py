@@ -1,5 +1,6 @@
 from tags.models import Tag
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.conf import settings
 
 
@@ -25,5 +26,12 @@ class News(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["name"], name="news_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["english_name"], name="news_en_name_trgm", opclasses=["gin_trgm_ops"]),
+            models.Index(fields=["-publish_time", "-id"], name="news_publish_keyset_idx"),
+        ]
+
     def __str__(self):
         return self.name
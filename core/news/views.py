@@ -5,6 +5,7 @@ from django.http import Http404
 from django.contrib.auth.mixins import LoginRequiredMixin
 from .mongo_service.category_service import NewsCategoryService
 from django.views.generic import TemplateView, ListView, DetailView
+from core.pagination import KeysetPaginationMixin
 
 
 def _map_category_doc(doc):
@@ -50,13 +51,14 @@ class NewsCategoryDetailPage(LoginRequiredMixin, TemplateView):
         return ctx
 
 
-class NewsListPage(LoginRequiredMixin, ListView):
+class NewsListPage(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     template_name = "news/news_list.html"
     context_object_name = "news_list"
     paginate_by = 10
+    keyset_ordering = ("-publish_time", "-id")
 
     def get_queryset(self):
-        qs = News.objects.all().order_by("-publish_time")
+        qs = News.objects.all().order_by(*self.keyset_ordering)
         category = self.request.GET.get("category")
         if category:
             qs = qs.filter(category_id=category)
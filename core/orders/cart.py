@@ -0,0 +1,217 @@
+"""
+Cache-backed shopping cart.
+
+A cart is one Redis hash (product id -> quantity) under "cart:<owner>", where
+owner is "u:<user id>" for customers and "a:<random id kept in the session>"
+for anonymous visitors (the id survives the session-key rotation at login).
+Adds are a single HINCRBY, so concurrent clicks never lose an update.
+
+CartItem stays the durable copy for logged-in users: every change schedules
+orders.tasks.persist_cart_task (debounced), and a cold hash is reloaded from
+CartItem on first use. On login the anonymous hash is merged into the user's
+(orders.signals).
+
+Non-Redis cache backends (local dev) keep the same dict under a plain cache
+key; that fallback is not atomic.
+"""
+import secrets
+from dataclasses import dataclass
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+
+from products.models.product import Product
+
+from .models import CartItem
+
+CART_TTL = 14 * 24 * 3600
+PERSIST_DELAY = 5  # seconds; changes within this window are written to CartItem once
+MAX_QUANTITY = 999
+SESSION_KEY = "cart_id"
+_LOADED = "_"  # marker field: the hash was initialised (an empty cart is still "loaded")
+
+
+@dataclass
+class CartLine:
+    product: Product
+    quantity: int
+
+    @property
+    def total_price(self):
+        return (self.product.price or 0) * self.quantity
+
+
+class CartService:
+    # add(product_id, quantity=1) -> new quantity
+    # set(product_id, quantity) / remove(product_id) / clear()
+    # quantities() -> {product_id: quantity}; lines() -> [CartLine]; total_price(lines) -> int
+    # merge_into(other) -> moves this cart's items into `other`
+
+    def __init__(self, owner, user_id=None):
+        self.owner = owner
+        self.user_id = user_id
+        self.key = f"cart:{owner}"
+
+    @classmethod
+    def for_user(cls, user):
+        return cls.for_user_id(user.pk)
+
+    @classmethod
+    def for_user_id(cls, user_id):
+        return cls(f"u:{user_id}", user_id=user_id)
+
+    @classmethod
+    def for_request(cls, request, create=True):
+        """The logged-in user's cart, or the session's anonymous cart (None if it has none and not create)."""
+        if request.user.is_authenticated:
+            return cls.for_user(request.user)
+        cart_id = request.session.get(SESSION_KEY)
+        if not cart_id:
+            if not create:
+                return None
+            cart_id = request.session[SESSION_KEY] = secrets.token_urlsafe(16)
+        return cls(f"a:{cart_id}")
+
+    # ---------- storage ----------
+
+    @staticmethod
+    def _redis():
+        backend = caches["default"]
+        if isinstance(backend, RedisCache):
+            return backend._cache.get_client(write=True)
+        return None
+
+    def _cache_key(self):
+        return cache.make_and_validate_key(self.key)
+
+    def _ensure_loaded(self, client):
+        """Read-through: a cold user cart is filled from CartItem once."""
+        if client is not None:
+            key = self._cache_key()
+            # HSETNX on the marker elects one loader; HINCRBY keeps adds that race with it
+            if not client.hsetnx(key, _LOADED, 1):
+                return
+            with client.pipeline() as pipe:
+                for product_id, quantity in self._stored_rows().items():
+                    pipe.hincrby(key, str(product_id), quantity)
+                pipe.expire(key, CART_TTL)
+                pipe.execute()
+        elif cache.get(self.key) is None:
+            cache.add(self.key, self._stored_rows(), CART_TTL)
+
+    def _stored_rows(self):
+        if self.user_id is None:
+            return {}
+        return dict(CartItem.objects.filter(user_id=self.user_id).values_list("product_id", "quantity"))
+
+    def _changed(self):
+        if self.user_id is None:
+            return
+        # debounce: one persist task per PERSIST_DELAY window per user
+        if cache.add(f"cart:persist:{self.user_id}", 1, PERSIST_DELAY):
+            from .tasks import persist_cart_task
+            persist_cart_task.apply_async((self.user_id,), countdown=PERSIST_DELAY)
+
+    # ---------- API ----------
+
+    def quantities(self):
+        client = self._redis()
+        self._ensure_loaded(client)
+        if client is not None:
+            raw = client.hgetall(self._cache_key())
+            return {int(k): int(v) for k, v in raw.items() if k.decode() != _LOADED and int(v) > 0}
+        return {pid: qty for pid, qty in (cache.get(self.key) or {}).items() if qty > 0}
+
+    def add(self, product_id, quantity=1):
+        client = self._redis()
+        self._ensure_loaded(client)
+        if client is not None:
+            key = self._cache_key()
+            with client.pipeline() as pipe:
+                pipe.hincrby(key, str(product_id), quantity)
+                pipe.expire(key, CART_TTL)
+                new_quantity = pipe.execute()[0]
+            if new_quantity > MAX_QUANTITY:
+                client.hset(key, str(product_id), MAX_QUANTITY)
+                new_quantity = MAX_QUANTITY
+        else:
+            rows = cache.get(self.key) or {}
+            new_quantity = min(rows.get(product_id, 0) + quantity, MAX_QUANTITY)
+            rows[product_id] = new_quantity
+            cache.set(self.key, rows, CART_TTL)
+        self._changed()
+        return new_quantity
+
+    def set(self, product_id, quantity):
+        if quantity <= 0:
+            return self.remove(product_id)
+        client = self._redis()
+        self._ensure_loaded(client)
+        quantity = min(quantity, MAX_QUANTITY)
+        if client is not None:
+            client.hset(self._cache_key(), str(product_id), quantity)
+        else:
+            rows = cache.get(self.key) or {}
+            rows[product_id] = quantity
+            cache.set(self.key, rows, CART_TTL)
+        self._changed()
+
+    def remove(self, product_id):
+        client = self._redis()
+        self._ensure_loaded(client)
+        if client is not None:
+            client.hdel(self._cache_key(), str(product_id))
+        else:
+            rows = cache.get(self.key) or {}
+            rows.pop(product_id, None)
+            cache.set(self.key, rows, CART_TTL)
+        self._changed()
+
+    def clear(self):
+        client = self._redis()
+        if client is not None:
+            key = self._cache_key()
+            with client.pipeline() as pipe:
+                pipe.delete(key)
+                pipe.hset(key, _LOADED, 1)
+                pipe.expire(key, CART_TTL)
+                pipe.execute()
+        else:
+            cache.set(self.key, {}, CART_TTL)
+        self._changed()
+
+    def lines(self):
+        """Cart contents with products (one query); inactive or deleted products are left out."""
+        quantities = self.quantities()
+        products = Product.objects.filter(pk__in=quantities, is_active=True).in_bulk()
+        return [CartLine(products[pid], qty) for pid, qty in quantities.items() if pid in products]
+
+    @staticmethod
+    def total_price(lines):
+        return sum(line.total_price for line in lines)
+
+    def merge_into(self, other):
+        """Add this cart's quantities to `other` (anonymous -> user at login) and empty this one."""
+        quantities = self.quantities()
+        if not quantities:
+            return
+        for product_id, quantity in quantities.items():
+            other.add(product_id, quantity)
+        client = self._redis()
+        if client is not None:
+            client.delete(self._cache_key())
+        else:
+            cache.delete(self.key)
+
+
+def persist_cart(user_id):
+    """Write the cached cart of `user_id` to CartItem (upsert + delete of removed lines)."""
+    quantities = CartService.for_user_id(user_id).quantities()
+    existing = set(Product.objects.filter(pk__in=quantities).values_list("pk", flat=True))
+    with transaction.atomic():
+        CartItem.objects.filter(user_id=user_id).exclude(product_id__in=existing).delete()
+        CartItem.objects.bulk_create(
+            [CartItem(user_id=user_id, product_id=pid, quantity=qty) for pid, qty in quantities.items() if pid in existing],
+            update_conflicts=True, unique_fields=["user", "product"], update_fields=["quantity"],
+        )
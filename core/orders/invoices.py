@@ -0,0 +1,156 @@
+"""
+PDF invoices.
+
+An invoice is rendered once per order *version* (status, totals, payment ref
+and INVOICE_LAYOUT_VERSION) and kept in default_storage under
+invoices/<order id>/<version>.pdf, so repeat views are a file read. Orders
+are pre-rendered by orders.tasks.render_invoice_task when they become paid;
+a view that finds no file renders it inline once.
+
+Persian text is shaped (arabic_reshaper) and reordered for display
+(python-bidi) before drawing, with a TTF that has Arabic-script glyphs
+(settings.INVOICE_FONT_PATH, e.g. Vazirmatn; DejaVu Sans works too).
+"""
+import hashlib
+import io
+
+import arabic_reshaper
+from bidi.algorithm import get_display
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .models import Order
+
+# bump when the layout below changes, so cached files are re-rendered
+INVOICE_LAYOUT_VERSION = 1
+FONT_NAME = "InvoiceFont"
+DEFAULT_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+STATUS_LABELS = {
+    "pending": "در انتظار پرداخت",
+    "paid": "پرداخت‌شده",
+    "sent": "ارسال‌شده",
+    "delivered": "تحویل‌شده",
+    "failed": "ناموفق",
+}
+
+_font_registered = False
+
+
+def _register_font():
+    global _font_registered
+    if not _font_registered:
+        path = getattr(settings, "INVOICE_FONT_PATH", None) or DEFAULT_FONT_PATH
+        pdfmetrics.registerFont(TTFont(FONT_NAME, str(path)))
+        _font_registered = True
+
+
+def fa(text) -> str:
+    """Shape + visually reorder Persian text for ReportLab, which draws glyphs left to right as given."""
+    return get_display(arabic_reshaper.reshape(str(text)))
+
+
+def _money(value) -> str:
+    return f"{int(value or 0):,} تومان"
+
+
+# =====================================
+# Cache keys
+# =====================================
+
+def invoice_version(order) -> str:
+    raw = f"{INVOICE_LAYOUT_VERSION}:{order.status}:{order.total_price}:{order.item_count}:{order.ref_id}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def invoice_path(order) -> str:
+    return f"invoices/{order.pk}/{invoice_version(order)}.pdf"
+
+
+# =====================================
+# Rendering
+# =====================================
+
+def render_pdf(order) -> bytes:
+    """The invoice as PDF bytes. Items come from their checkout snapshots in one query."""
+    _register_font()
+    items = list(order.items.order_by("pk"))
+
+    buf = io.BytesIO()
+    width, height = A4
+    right = width - 50
+    p = canvas.Canvas(buf, pagesize=A4)
+    p.setTitle(f"Invoice #{order.pk}")
+
+    def line(y, text, size=11, x=right):
+        p.setFont(FONT_NAME, size)
+        p.drawRightString(x, y, fa(text))
+
+    y = height - 60
+    line(y, f"صورتحساب سفارش #{order.pk}", size=16)
+    y -= 28
+    line(y, f"تاریخ: {timezone.localtime(order.created_at):%Y-%m-%d}")
+    y -= 18
+    line(y, f"وضعیت: {STATUS_LABELS.get(order.status, order.status)}")
+    if order.ref_id:
+        y -= 18
+        line(y, f"کد پیگیری پرداخت: {order.ref_id}")
+
+    # columns, right to left: name | quantity | unit price | line total
+    columns = (right, right - 250, right - 320, right - 420)
+    y -= 34
+    for x, title in zip(columns, ("محصول", "تعداد", "قیمت واحد", "مجموع")):
+        line(y, title, size=10, x=x)
+    y -= 6
+    p.line(50, y, right, y)
+    y -= 16
+    for item in items:
+        if y < 80:
+            p.showPage()
+            y = height - 60
+        line(y, item.product_name, size=10, x=columns[0])
+        line(y, item.quantity, size=10, x=columns[1])
+        line(y, _money(item.unit_price), size=10, x=columns[2])
+        line(y, _money(item.line_total), size=10, x=columns[3])
+        y -= 18
+
+    y -= 10
+    line(y, f"مجموع کل: {_money(order.total_price)}", size=12)
+    y -= 30
+    line(y, "از خرید شما سپاسگزاریم!", size=10)
+    p.showPage()
+    p.save()
+    return buf.getvalue()
+
+
+def get_invoice(order) -> str:
+    """Storage path of the current invoice of `order`, rendering it first if needed."""
+    path = invoice_path(order)
+    if default_storage.exists(path):
+        return path
+    saved = default_storage.save(path, ContentFile(render_pdf(order)))
+    if saved != path:
+        # a concurrent render won the name; keep one file
+        default_storage.delete(saved)
+    _drop_old_versions(order, keep=path)
+    return path
+
+
+def _drop_old_versions(order, keep):
+    folder = f"invoices/{order.pk}"
+    _, files = default_storage.listdir(folder)
+    for name in files:
+        if f"{folder}/{name}" != keep:
+            default_storage.delete(f"{folder}/{name}")
+
+
+def prerender(order_id):
+    order = Order.objects.filter(pk=order_id).first()
+    if order is not None:
+        get_invoice(order)
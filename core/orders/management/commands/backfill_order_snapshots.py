@@ -0,0 +1,64 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from orders import rollup
+from orders.models import Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = "Fills the OrderItem price/name/seller snapshots and Order.item_count for orders placed before they existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per UPDATE batch.")
+        parser.add_argument("--rebuild-rollup", action="store_true",
+                            help="Rebuild DailySalesRollup from the snapshots afterwards.")
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+
+        # items: keyset over pk, one bulk_update per batch
+        items_done = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                OrderItem.objects
+                .filter(pk__gt=last_pk, unit_price__isnull=True)
+                .select_related("product")
+                .only("id", "quantity", "product__name", "product__price", "product__seller_id")
+                .order_by("pk")[:batch_size]
+            )
+            if not batch:
+                break
+            for item in batch:
+                item.take_snapshot()
+            with transaction.atomic():
+                OrderItem.objects.bulk_update(batch, ["product_name", "seller", "unit_price", "line_total"])
+            items_done += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"  items: {items_done}")
+
+        # orders: one UPDATE ... = (SELECT SUM(quantity)) per pk range
+        item_count = Subquery(
+            OrderItem.objects.filter(order=OuterRef("pk")).values("order")
+            .annotate(n=Sum("quantity")).values("n")[:1]
+        )
+        orders_done = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Order.objects.filter(pk__gt=last_pk, item_count__isnull=True)
+                .order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            orders_done += Order.objects.filter(pk__in=pks).update(item_count=Coalesce(item_count, 0))
+            last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Snapshots backfilled ({items_done} items, {orders_done} orders)."
+        ))
+        if opts["rebuild_rollup"]:
+            count = rollup.rebuild(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"✅ Sales rollup rebuilt ({count} rows)."))
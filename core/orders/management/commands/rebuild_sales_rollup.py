@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+from orders import rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuilds DailySalesRollup (per-day sales chart table) from all orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT.")
+
+    def handle(self, *args, **opts):
+        count = rollup.rebuild(batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Sales rollup rebuilt ({count} rows)."))
@@ -0,0 +1,29 @@
+from django.core.files.storage import default_storage
+from django.core.management import BaseCommand
+
+from orders import invoices
+from orders.models import Order
+from orders.tasks import render_invoice_task
+
+
+class Command(BaseCommand):
+    help = "Pre-renders (or queues) PDF invoices of paid/sent/delivered orders that have no cached file yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--queue", action="store_true", help="Queue celery tasks instead of rendering here.")
+
+    def handle(self, *args, **opts):
+        done = 0
+        orders = (Order.objects.filter(status__in=("paid", "sent", "delivered"))
+                  .only("id", "status", "total_price", "item_count", "ref_id", "created_at")
+                  .order_by("pk"))
+        for order in orders.iterator(chunk_size=opts["batch_size"]):
+            if default_storage.exists(invoices.invoice_path(order)):
+                continue
+            if opts["queue"]:
+                render_invoice_task.delay(order.pk)
+            else:
+                invoices.get_invoice(order)
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f"✅ {done} invoices {'queued' if opts['queue'] else 'rendered'}."))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management import BaseCommand
+from orders.zarinpal_stub import StubZarinpalServer
+
+
+class Command(BaseCommand):
+    help = "Runs a local Zarinpal stub gateway (set ZARINPAL_BASE_URL to the printed URL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each API answer.")
+
+    def handle(self, *args, **opts):
+        server = StubZarinpalServer(host=opts["host"], port=opts["port"], latency=opts["latency"], verbose=True)
+        self.stdout.write(self.style.SUCCESS(f"✅ Zarinpal stub listening, ZARINPAL_BASE_URL={server.base_url}"))
+        with server:
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
@@ -20,6 +20,14 @@ class Order(models.Model):
         ('delivered', 'Delivered'),
         ('failed', 'Failed'),
     ]
+    # status changes an admin may make (payment verification moves orders on its own)
+    ADMIN_TRANSITIONS = {
+        'pending': ('paid', 'failed'),
+        'paid': ('sent',),
+        'sent': ('delivered',),
+        'delivered': (),
+        'failed': (),
+    }
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
     total_price = models.PositiveIntegerField()
@@ -29,9 +37,95 @@ class Order(models.Model):
     location = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     authority = models.CharField(max_length=64, blank=True, null=True)  # Zarinpal Authority Code
+    # payment verification (orders.services): callback receipt and the gateway's confirmation
+    callback_at = models.DateTimeField(blank=True, null=True)
+    verified_at = models.DateTimeField(blank=True, null=True)
+    ref_id = models.CharField(max_length=64, blank=True, null=True)  # Zarinpal RefID
+    item_count = models.PositiveIntegerField(null=True, blank=True)  # sum of item quantities, set at checkout
+
+    class Meta:
+        constraints = [
+            # callbacks and verification look orders up by authority; one order per authority
+            models.UniqueConstraint(fields=['authority'], condition=models.Q(authority__isnull=False),
+                                    name='order_authority_uniq'),
+        ]
+        indexes = [
+            # keyset pagination of the admin order list, with and without ?status=
+            models.Index(fields=['-created_at', '-id'], name='order_created_keyset_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='order_status_created_idx'),
+        ]
+
+    @classmethod
+    def admin_sources(cls, new_status):
+        """Statuses an admin can move to new_status from."""
+        return [old for old, targets in cls.ADMIN_TRANSITIONS.items() if new_status in targets]
+
+    def can_admin_change_status(self, new_status):
+        return new_status in self.ADMIN_TRANSITIONS.get(self.status, ())
 
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+
+    # snapshot of the product at checkout, so invoices and reports show what was sold
+    # without joining Product (null only on rows not yet backfilled: backfill_order_snapshots)
+    product_name = models.CharField(max_length=255, blank=True, default='')
+    seller = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    unit_price = models.PositiveIntegerField(null=True, blank=True)
+    line_total = models.PositiveIntegerField(null=True, blank=True)
+
+    @classmethod
+    def from_product(cls, order, product, quantity):
+        item = cls(order=order, product=product, quantity=quantity)
+        item.take_snapshot()
+        return item
+
+    def take_snapshot(self):
+        """Copy name/seller/price from self.product (checkout, or backfill of old rows)."""
+        self.product_name = self.product.name
+        self.seller_id = self.product.seller_id
+        self.unit_price = int(self.product.price or 0)
+        self.line_total = self.unit_price * self.quantity
+
+    def get_total(self):
+        return self.line_total
+
+
+class DailySalesRollup(models.Model):
+    """
+    Sales pre-aggregated per (day, order status, bucket); maintained by orders.rollup.
+
+    bucket is "all" for site-wide totals, "s:<seller id>" per seller and
+    "p:<product id>" per product, so one unique key covers every grain.
+    Charts read these rows instead of scanning Order.
+    """
+    BUCKET_ALL = 'all'
+
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    bucket = models.CharField(max_length=40)
+    seller = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    product = models.ForeignKey(Product, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+
+    order_count = models.IntegerField(default=0)
+    items_sold = models.IntegerField(default=0)
+    revenue = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status', 'bucket'], name='sales_rollup_key'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket', 'status', 'day'], name='sales_rollup_bucket_day_idx'),
+            models.Index(fields=['seller', 'status', 'day'], name='sales_rollup_seller_day_idx'),
+        ]
+
+    @staticmethod
+    def seller_bucket(seller_id):
+        return f's:{seller_id}'
+
+    @staticmethod
+    def product_bucket(product_id):
+        return f'p:{product_id}'
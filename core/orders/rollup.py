@@ -0,0 +1,206 @@
+"""
+Incremental maintenance of DailySalesRollup.
+
+Every order contributes one row per grain to the bucket of its creation day
+and current status:
+
+    "all"          order_count=1, items_sold=sum(qty), revenue=total_price
+    "s:<seller>"   the same, restricted to that seller's lines
+    "p:<product>"  the same, restricted to that product's lines
+
+A status change moves the contribution from (day, old) to (day, new) with two
+upserts, so the table never needs a rescan. `rebuild()` recomputes everything
+from Order/OrderItem (management command: rebuild_sales_rollup). Revenue and
+seller come from the OrderItem checkout snapshots, never from today's Product.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailySalesRollup, Order, OrderItem
+
+ALL = DailySalesRollup.BUCKET_ALL
+UPSERT_CHUNK = 1000  # rows per INSERT (8 params each, well under the 65535 limit)
+
+
+def order_contributions(order):
+    """Order -> [(bucket, seller_id, product_id, order_count, items_sold, revenue)] from the item snapshots."""
+    items = list(order.items.values_list("product_id", "seller_id", "quantity", "line_total"))
+    return _contributions(order.total_price, items)
+
+
+def _contributions(total_price, items):
+    rows = [(ALL, None, None, 1, sum(qty for _, _, qty, _ in items), int(total_price or 0))]
+
+    per_seller = defaultdict(lambda: [0, 0])
+    per_product = defaultdict(lambda: [0, 0])
+    for product_id, seller_id, qty, line_total in items:
+        per_product[(product_id, seller_id)][0] += qty
+        per_product[(product_id, seller_id)][1] += line_total or 0
+        if seller_id:
+            per_seller[seller_id][0] += qty
+            per_seller[seller_id][1] += line_total or 0
+
+    for seller_id, (qty, revenue) in per_seller.items():
+        rows.append((DailySalesRollup.seller_bucket(seller_id), seller_id, None, 1, qty, revenue))
+    for (product_id, seller_id), (qty, revenue) in per_product.items():
+        rows.append((DailySalesRollup.product_bucket(product_id), seller_id, product_id, 1, qty, revenue))
+    return rows
+
+
+def _upsert(day, status, rows, sign):
+    """Add sign * rows to the (day, status) buckets in one INSERT .. ON CONFLICT."""
+    _upsert_rows([
+        (day, status, bucket, seller_id, product_id, sign * orders, sign * items, sign * revenue)
+        for bucket, seller_id, product_id, orders, items, revenue in rows
+    ])
+
+
+def _upsert_rows(rows):
+    """rows: [(day, status, bucket, seller_id, product_id, order_count, items_sold, revenue)] deltas, unique per key."""
+    if not rows:
+        return
+    table = connection.ops.quote_name(DailySalesRollup._meta.db_table)
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start:start + UPSERT_CHUNK]
+        values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+        params = [value for row in chunk for value in row]
+        sql = f"""
+            INSERT INTO {table} AS r
+                (day, status, bucket, seller_id, product_id, order_count, items_sold, revenue)
+            VALUES {values}
+            ON CONFLICT (day, status, bucket) DO UPDATE SET
+                order_count = r.order_count + EXCLUDED.order_count,
+                items_sold = r.items_sold + EXCLUDED.items_sold,
+                revenue = r.revenue + EXCLUDED.revenue
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+def order_day(order):
+    return timezone.localdate(order.created_at)
+
+
+def record_order(order):
+    """A new order (items already saved) enters the rollup under its current status."""
+    _upsert(order_day(order), order.status, order_contributions(order), +1)
+
+
+def record_status_change(order, old_status, new_status):
+    """Move the order's contribution from old_status to new_status."""
+    if old_status == new_status:
+        return
+    rows = order_contributions(order)
+    day = order_day(order)
+    with transaction.atomic():
+        _upsert(day, old_status, rows, -1)
+        _upsert(day, new_status, rows, +1)
+
+
+def record_status_changes(orders, new_status):
+    """
+    Bulk form of record_status_change: `orders` still carry their old status.
+    One query for the items of all orders, one upsert for every bucket touched.
+    """
+    orders = [o for o in orders if o.status != new_status]
+    if not orders:
+        return
+    items = defaultdict(list)
+    for order_id, *line in (OrderItem.objects.filter(order_id__in=[o.pk for o in orders])
+                            .values_list("order_id", "product_id", "seller_id", "quantity", "line_total")):
+        items[order_id].append(line)
+
+    # net deltas per (day, status, bucket): one row per key, ON CONFLICT may touch a row once per statement
+    deltas = {}
+    for order in orders:
+        day = order_day(order)
+        for bucket, seller_id, product_id, *measures in _contributions(order.total_price, items[order.pk]):
+            for status, sign in ((order.status, -1), (new_status, +1)):
+                row = deltas.setdefault((day, status, bucket), [seller_id, product_id, 0, 0, 0])
+                for i, value in enumerate(measures):
+                    row[2 + i] += sign * value
+    with transaction.atomic():
+        _upsert_rows([(*key, *row) for key, row in deltas.items()])
+
+
+# =====================================
+# Full rebuild
+# =====================================
+
+def rebuild(batch_size=1000):
+    """Recompute the whole table from Order/OrderItem with grouped queries. Returns row count."""
+    def day_of(field):
+        return TruncDate(field)  # current timezone, same as order_day()
+
+    rows = [
+        DailySalesRollup(day=r["day"], status=r["status"], bucket=ALL, order_count=r["n"],
+                         items_sold=int(r["qty"] or 0), revenue=int(r["revenue"] or 0))
+        for r in (Order.objects.annotate(day=day_of("created_at")).values("day", "status")
+                  .annotate(n=Count("id"), qty=Sum("item_count"), revenue=Sum("total_price")))
+    ]
+
+    # per-seller / per-product grains read the checkout snapshots (seller_id, line_total)
+    lines = OrderItem.objects.annotate(day=day_of("order__created_at"))
+    measures = dict(
+        n=Count("order_id", distinct=True),
+        qty=Sum("quantity"),
+        revenue=Sum("line_total"),
+    )
+    for r in (lines.filter(seller__isnull=False)
+              .values("day", "order__status", "seller_id").annotate(**measures)):
+        seller_id = r["seller_id"]
+        rows.append(DailySalesRollup(
+            day=r["day"], status=r["order__status"], bucket=DailySalesRollup.seller_bucket(seller_id),
+            seller_id=seller_id, order_count=r["n"], items_sold=r["qty"] or 0, revenue=int(r["revenue"] or 0),
+        ))
+    for r in (lines.values("day", "order__status", "product_id", "seller_id")
+              .annotate(**measures)):
+        rows.append(DailySalesRollup(
+            day=r["day"], status=r["order__status"], bucket=DailySalesRollup.product_bucket(r["product_id"]),
+            seller_id=r["seller_id"], product_id=r["product_id"],
+            order_count=r["n"], items_sold=r["qty"] or 0, revenue=int(r["revenue"] or 0),
+        ))
+
+    with transaction.atomic():
+        DailySalesRollup.objects.all().delete()
+        DailySalesRollup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+# =====================================
+# Chart reads
+# =====================================
+
+def _status_filter(status):
+    """status may be one value or a tuple of values (e.g. every "sold" status)."""
+    if isinstance(status, (list, tuple, set)):
+        return {"status__in": list(status)}
+    return {"status": status}
+
+
+def daily_series(start_date, days, bucket=ALL, status="paid", measure="revenue"):
+    """{"labels": [iso dates], "data": [int]} for `days` days from start_date (zeros filled)."""
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    rows = (DailySalesRollup.objects
+            .filter(bucket=bucket, day__gte=dates[0], day__lte=dates[-1], **_status_filter(status))
+            .values("day")
+            .annotate(total=Sum(measure))
+            .values_list("day", "total"))
+    by_day = dict(rows)
+    return {
+        "labels": [d.isoformat() for d in dates],
+        "data": [int(by_day.get(d) or 0) for d in dates],
+    }
+
+
+def bucket_total(start_date, end_date, bucket=ALL, status="paid"):
+    """{"order_count", "items_sold", "revenue"} summed over [start_date, end_date]."""
+    agg = (DailySalesRollup.objects
+           .filter(bucket=bucket, day__gte=start_date, day__lte=end_date, **_status_filter(status))
+           .aggregate(order_count=Sum("order_count"), items_sold=Sum("items_sold"), revenue=Sum("revenue")))
+    return {k: int(v or 0) for k, v in agg.items()}
@@ -0,0 +1,286 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from inventory import services as inventory
+from payments.models import FailedPayment
+
+from . import rollup
+from .cart import CartService
+from .models import Order, OrderItem
+from .zarinpal_client import (
+    CODE_ALREADY_VERIFIED, CODE_OK, VERIFY_DECLINED_CODES, GatewayUnavailable, ZarinpalError, get_gateway,
+)
+
+# pending orders that never got a gateway authority are swept after this long
+ORPHAN_ORDER_MINUTES = 15
+# pending orders with an authority but no verification are reconciled after this long
+RECONCILE_AFTER_MINUTES = 20
+RECONCILE_BATCH_SIZE = 100
+# most orders one admin bulk transition may touch
+BULK_STATUS_LIMIT = 1000
+VERIFY_LOCK_SECONDS = 60
+
+
+@transaction.atomic
+def change_order_status(order, new_status, **fields):
+    """
+    Move `order` to new_status and keep DailySalesRollup in step.
+
+    The UPDATE is conditional on the status we read, so two concurrent
+    transitions (e.g. a repeated gateway callback) cannot both apply.
+    Extra `fields` are written in the same UPDATE.
+    Returns True when this call performed the transition.
+    """
+    old_status = order.status
+    if old_status == new_status:
+        return False
+    updated = Order.objects.filter(pk=order.pk, status=old_status).update(status=new_status, **fields)
+    if not updated:
+        return False
+    order.status = new_status
+    for name, value in fields.items():
+        setattr(order, name, value)
+    rollup.record_status_change(order, old_status, new_status)
+    _after_status_change([order], new_status)
+    return True
+
+
+@transaction.atomic
+def bulk_change_order_status(order_ids, new_status):
+    """
+    Admin bulk transition (Order.ADMIN_TRANSITIONS) -> (changed, skipped)
+    changed: [(order id, old status)]; skipped: ids that are missing or can't move to new_status.
+
+    The orders are locked, then moved with one UPDATE per source status; the
+    rollup is adjusted in one upsert and the stock/invoice hooks run after commit.
+    """
+    order_ids = set(order_ids)
+    orders = list(
+        Order.objects.select_for_update()
+        .filter(pk__in=order_ids, status__in=Order.admin_sources(new_status))
+        .only("pk", "status", "created_at", "total_price")
+        .order_by("pk")  # one lock order, so concurrent bulk updates can't deadlock
+    )
+    by_status = {}
+    for order in orders:
+        by_status.setdefault(order.status, []).append(order.pk)
+    for old_status, pks in by_status.items():
+        Order.objects.filter(pk__in=pks, status=old_status).update(status=new_status)
+    rollup.record_status_changes(orders, new_status)
+
+    changed = [(order.pk, order.status) for order in orders]
+    for order in orders:
+        order.status = new_status
+    _after_status_change(orders, new_status)
+    skipped = sorted(order_ids - {pk for pk, _ in changed})
+    return changed, skipped
+
+
+def _after_status_change(orders, new_status):
+    # stock counters are hot rows: touch them after commit, in autocommit
+    if new_status == "paid":
+        def paid():
+            for order in orders:
+                inventory.commit_order(order)
+                _queue_invoice(order.pk)
+        transaction.on_commit(paid)
+    elif new_status == "failed":
+        def failed():
+            for order in orders:
+                inventory.release_order(order)
+        transaction.on_commit(failed)
+
+
+def _queue_invoice(order_id):
+    from .tasks import render_invoice_task  # tasks imports this module
+    render_invoice_task.delay(order_id)
+
+
+# =====================================
+# Checkout pipeline
+# =====================================
+# 1. place_order(): stock reserved (inventory.services), then a short
+#    transaction — order + items + holds + rollup; the products leave the cart.
+# 2. request_order_payment(): gateway call outside any transaction, then the
+#    authority is written back with a conditional UPDATE.
+# 3. sweep_orphaned_orders(): (celery beat) fails pending orders whose step 2
+#    never completed, e.g. the worker died mid-request.
+
+def place_order(user, cart_lines, address, location=""):
+    """
+    -> Order (status "pending", no authority yet). Commits before any network I/O.
+    `cart_lines` are CartService.lines(); the ordered products leave the cart afterwards.
+    Raises inventory.services.OutOfStock when a stock-tracked product ran out.
+    """
+    taken = inventory.reserve(cart_lines)  # autocommit conditional decrements, before the transaction
+    try:
+        order = _create_order(user, cart_lines, address, location, taken)
+    except Exception:
+        inventory.give_back(taken)
+        raise
+    cart = CartService.for_user(user)
+    for line in cart_lines:
+        cart.remove(line.product.pk)
+    return order
+
+
+@transaction.atomic
+def _create_order(user, cart_items, address, location, taken):
+    order = Order(
+        user=user,
+        address=address,
+        location=location or "",
+        status="pending",
+    )
+    items = [OrderItem.from_product(order, ci.product, ci.quantity) for ci in cart_items]
+    order.total_price = sum(i.line_total for i in items)
+    order.item_count = sum(i.quantity for i in items)
+    order.save()
+    OrderItem.objects.bulk_create(items)  # picks up order.pk assigned by save()
+    inventory.hold_for_order(order, taken)
+    rollup.record_order(order)
+    return order
+
+
+def request_order_payment(order):
+    """
+    -> StartPay URL for `order`. Must not run inside a transaction.
+
+    Raises ZarinpalError / GatewayUnavailable from the client. If another
+    request already attached an authority (double submit), that one wins and
+    its URL is returned, so an order never ends up with two live payments.
+    """
+    if order.authority:
+        return get_gateway().start_pay_url(order.authority)
+
+    result = get_gateway().request_payment(
+        amount=order.total_price,
+        description=f"Order #{order.id}",
+        callback_url=getattr(settings, "ZARINPAL_CALLBACK", ""),
+        phone=getattr(order.user, "phone_number", ""),
+    )
+    authority = result["authority"]
+    updated = Order.objects.filter(pk=order.pk, status="pending", authority__isnull=True).update(authority=authority)
+    if not updated:
+        order.refresh_from_db(fields=["authority", "status"])
+        if not order.authority:
+            # swept or cancelled meanwhile; the fresh authority is simply never used
+            raise ValueError(f"Order #{order.pk} is no longer awaiting payment")
+        return get_gateway().start_pay_url(order.authority)
+    order.authority = authority
+    return result["url"]
+
+
+def fail_checkout(order, restore_cart=True):
+    """Mark a checkout that never reached the gateway as failed and put its items back in the cart."""
+    if not change_order_status(order, "failed"):
+        return False
+    if restore_cart:
+        cart = CartService.for_user_id(order.user_id)
+        for item in order.items.all():
+            cart.add(item.product_id, item.quantity)
+    return True
+
+
+def sweep_orphaned_orders(older_than_minutes=None):
+    """Fail pending orders that never got an authority within the timeout. -> number swept."""
+    minutes = older_than_minutes or getattr(settings, "ORPHAN_ORDER_MINUTES", ORPHAN_ORDER_MINUTES)
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    orphans = Order.objects.filter(status="pending", authority__isnull=True, created_at__lt=cutoff)
+    swept = 0
+    for order in orphans.iterator(chunk_size=200):
+        swept += fail_checkout(order)
+    return swept
+
+
+# =====================================
+# Payment verification
+# =====================================
+# The gateway callback only records itself (record_callback) and queues
+# orders.tasks.verify_payment_task; verify_order() does the gateway round trip
+# and finalizes with change_order_status, which is conditional on "pending",
+# so replayed callbacks, task retries and the reconciliation job can overlap
+# safely. reconcile_pending_orders() catches callbacks that never arrived.
+
+def record_callback(authority, status_param):
+    """
+    -> (order or None, first) for a gateway callback. `first` is False for a
+    replayed callback, which must not queue another verification.
+    """
+    order = Order.objects.filter(authority=authority).first() if authority else None
+    if order is None:
+        return None, False
+    now = timezone.now()
+    first = bool(Order.objects.filter(pk=order.pk, callback_at__isnull=True).update(callback_at=now))
+    if first:
+        order.callback_at = now
+    if first and status_param != "OK":
+        # customer cancelled or the bank declined: nothing to verify
+        _finalize_failed(order, "پرداخت توسط کاربر لغو شد یا ناموفق بود.")
+    return order, first
+
+
+def verify_order(order):
+    """
+    Verify `order` with the gateway and finalize it. -> "paid" / "failed" / "skipped".
+
+    Only a decline (VERIFY_DECLINED_CODES) fails the order. GatewayUnavailable
+    and any other ZarinpalError (unexpected code, non-JSON answer) are raised
+    with the order left pending, to be retried.
+    """
+    if order.status != "pending" or not order.authority:
+        return "skipped"
+    # one gateway call per authority at a time across workers
+    lock_key = f"orders:verify:{order.authority}"
+    if not cache.add(lock_key, 1, VERIFY_LOCK_SECONDS):
+        return "skipped"
+    try:
+        try:
+            result = get_gateway().verify_payment(order.authority, order.total_price)
+        except GatewayUnavailable:
+            raise
+        except ZarinpalError as e:
+            if e.code not in VERIFY_DECLINED_CODES:
+                raise
+            _finalize_failed(order, f"تأیید پرداخت ناموفق بود (کد {e.code}).")
+            return "failed"
+        if result.get("status") not in (CODE_OK, CODE_ALREADY_VERIFIED):
+            raise ZarinpalError(f"Unexpected verify status {result.get('status')!r}")
+        change_order_status(order, "paid", verified_at=timezone.now(), ref_id=str(result.get("ref_id") or ""))
+        return "paid"
+    finally:
+        cache.delete(lock_key)
+
+
+def _finalize_failed(order, reason):
+    if change_order_status(order, "failed"):
+        FailedPayment.objects.create(user_id=order.user_id, amount=order.total_price, reason=reason)
+
+
+def reconcile_pending_orders(older_than_minutes=None, batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Verify stale pending orders that have an authority (lost or unprocessed
+    callbacks). Stops early while the gateway is unavailable; an order the
+    gateway gives no clear answer for stays pending and counts as skipped.
+    -> {"paid": n, "failed": n, "skipped": n}
+    """
+    minutes = older_than_minutes or getattr(settings, "PAYMENT_RECONCILE_MINUTES", RECONCILE_AFTER_MINUTES)
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    stale = (
+        Order.objects
+        .filter(status="pending", authority__isnull=False, created_at__lt=cutoff)
+        .order_by("created_at")[:batch_size]
+    )
+    counts = {"paid": 0, "failed": 0, "skipped": 0}
+    for order in stale:
+        try:
+            counts[verify_order(order)] += 1
+        except GatewayUnavailable:
+            break
+        except ZarinpalError:
+            counts["skipped"] += 1
+    return counts
@@ -0,0 +1,14 @@
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from .cart import SESSION_KEY, CartService
+
+
+@receiver(user_logged_in)
+def merge_session_cart(sender, request, user, **kwargs):
+    # the anonymous cart id lives in the session, which login() keeps (only the key rotates)
+    if request is None or not hasattr(request, "session"):
+        return
+    cart_id = request.session.pop(SESSION_KEY, None)
+    if cart_id:
+        CartService(f"a:{cart_id}").merge_into(CartService.for_user(user))
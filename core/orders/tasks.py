@@ -0,0 +1,42 @@
+from celery import shared_task
+
+from . import invoices
+from .cart import persist_cart
+from .models import Order
+from .services import reconcile_pending_orders, sweep_orphaned_orders, verify_order
+from .zarinpal_client import ZarinpalError
+
+
+@shared_task(name="verify_payment_task", bind=True, max_retries=5)
+def verify_payment_task(self, order_id):
+    order = Order.objects.filter(pk=order_id, status="pending").first()
+    if order is None:
+        return "skipped"
+    try:
+        return verify_order(order)
+    except ZarinpalError as exc:
+        # unavailable or no clear answer (declines are final in verify_order): left pending;
+        # reconcile_pending_orders_task is the backstop after the last retry
+        raise self.retry(exc=exc, countdown=min(300, 15 * 2 ** self.request.retries))
+
+
+@shared_task(name="reconcile_pending_orders_task")
+def reconcile_pending_orders_task():
+    return reconcile_pending_orders()
+
+
+@shared_task(name="sweep_orphaned_orders_task")
+def sweep_orphaned_orders_task():
+    return sweep_orphaned_orders()
+
+
+@shared_task(name="persist_cart_task")
+def persist_cart_task(user_id):
+    # scheduled (debounced) by orders.cart.CartService on every change
+    persist_cart(user_id)
+
+
+@shared_task(name="render_invoice_task")
+def render_invoice_task(order_id):
+    # queued when an order becomes paid, so the customer's first view is a file read
+    invoices.prerender(order_id)
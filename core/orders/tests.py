@@ -1,3 +1,110 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.idempotency import IdempotencyMiddleware
+from payments.models import FailedPayment
+
+from .models import Order
+from .services import verify_order
+from .zarinpal_client import ZarinpalError
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class IdempotentCheckoutTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = get_user_model().objects.create_user(phone_number="09120000001", password="x")
+        self.client.force_login(self.user)
+
+    def test_invalid_form_with_key_renders_the_form(self):
+        # CheckoutPage.form_invalid returns an unrendered TemplateResponse
+        url = reverse("orders_checkout")
+        first = self.client.post(url, {"idempotency_key": "abc"})
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("address", first.context["form"].errors)
+
+        retry = self.client.post(url, {"idempotency_key": "abc"})
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.content, first.content)
+
+    def test_invalid_form_without_key(self):
+        response = self.client.post(reverse("orders_checkout"), {})
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class IdempotencyMiddlewareTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.middleware = IdempotencyMiddleware(lambda request: None)
+        self.calls = 0
+
+    def view(self, request):
+        self.calls += 1
+        return TemplateResponse(request, engines["django"].from_string("call {{ n }}"), {"n": self.calls})
+
+    def post(self, user=None, key="k1"):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key}
+        if user is not None:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+        request = RequestFactory().post("/api/x/", **headers)
+        request.user = AnonymousUser()  # DRF authenticates after the middleware
+        return self.middleware.process_view(request, self.view, (), {})
+
+    def test_template_response_is_rendered_before_storing(self):
+        user = get_user_model().objects.create_user(phone_number="09120000004", password="x")
+        self.assertEqual(self.post(user).content, b"call 1")
+        retry = self.post(user)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.content, b"call 1")
+
+    def test_keys_are_scoped_to_the_jwt_user(self):
+        alice = get_user_model().objects.create_user(phone_number="09120000005", password="x")
+        bob = get_user_model().objects.create_user(phone_number="09120000006", password="x")
+        self.assertEqual(self.post(alice).content, b"call 1")
+        bob_response = self.post(bob)
+        self.assertEqual(bob_response.content, b"call 2")
+        self.assertFalse(bob_response.has_header("Idempotent-Replayed"))
+
+    def test_requests_without_an_owner_are_not_shared(self):
+        # the view runs every time and Django renders the response as usual
+        self.assertEqual(self.post().render().content, b"call 1")
+        self.assertEqual(self.post().render().content, b"call 2")
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class VerifyOrderTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(phone_number="09120000002", password="x")
+        self.order = Order.objects.create(user=user, total_price=10000, address="a", authority="A1")
+
+    def verify(self, error):
+        with mock.patch("orders.services.get_gateway") as gateway:
+            gateway.return_value.verify_payment.side_effect = error
+            return verify_order(self.order)
+
+    def test_decline_fails_the_order(self):
+        self.assertEqual(self.verify(ZarinpalError("declined", code=-51)), "failed")
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "failed")
+        self.assertTrue(FailedPayment.objects.exists())
+
+    def test_unclear_answer_leaves_the_order_pending(self):
+        for error in (ZarinpalError("Invalid response (HTTP 429)"), ZarinpalError("odd", code=-12)):
+            with self.assertRaises(ZarinpalError):
+                self.verify(error)
+            self.order.refresh_from_db()
+            self.assertEqual(self.order.status, "pending")
+        self.assertFalse(FailedPayment.objects.exists())
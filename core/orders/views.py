@@ -1,57 +1,55 @@
 # orders/views.py
 from django.conf import settings
-from django.db import transaction
 from django.contrib import messages
-from products.models.product import Product
-from .zarinpal_client import ZarinpalGateway
+from inventory.services import OutOfStock
+from .zarinpal_client import GatewayUnavailable, ZarinpalError
 from .forms import CartItemForm, CheckoutForm
-from .models import CartItem, Order, OrderItem
-from django.shortcuts import redirect, get_object_or_404
+from .cart import CartService
+from .services import fail_checkout, place_order, record_callback, request_order_payment
+from .tasks import verify_payment_task
+from django.shortcuts import redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils.decorators import method_decorator
+from core.idempotency import idempotent
 from django.views.generic import TemplateView, View, FormView
 
 
+@method_decorator(idempotent, name="post")
 class CartPage(LoginRequiredMixin, TemplateView):
     template_name = "orders/cart.html"
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        items = CartItem.objects.select_related("product").filter(user=self.request.user)
-        total_price = sum((ci.product.price or 0) * ci.quantity for ci in items)  # assumes Product.price
+        items = CartService.for_request(self.request).lines()
         ctx["items"] = items
-        ctx["total_price"] = total_price
+        ctx["total_price"] = CartService.total_price(items)
         ctx["add_form"] = CartItemForm()
         return ctx
 
     def post(self, request, *args, **kwargs):
         """
-        Handle add/update actions from the cart page.
-        If the (user, product) exists, increase quantity; else create.
+        Handle add actions from the cart page.
+        The quantity is added atomically in the cached cart (orders.cart).
         """
         form = CartItemForm(request.POST)
         if form.is_valid():
-            product = get_object_or_404(Product, pk=form.cleaned_data["product"])
-            qty = form.cleaned_data["quantity"]
-
-            obj, created = CartItem.objects.get_or_create(user=request.user, product=product, defaults={"quantity": qty})
-            if not created:
-                obj.quantity += qty
-                obj.save()
-
+            product = form.cleaned_data["product"]
+            CartService.for_request(request).add(product.pk, form.cleaned_data["quantity"])
             messages.success(request, "آیتم به سبد اضافه شد.")
         else:
             messages.error(request, "ورودی نامعتبر است.")
         return redirect("orders_cart")
 
 
+@method_decorator(idempotent, name="post")
 class CartItemRemoveView(LoginRequiredMixin, View):
-    def post(self, request, pk):
-        item = get_object_or_404(CartItem, pk=pk, user=request.user)
-        item.delete()
+    def post(self, request, product_id):
+        CartService.for_request(request).remove(product_id)
         messages.info(request, "آیتم از سبد حذف شد.")
         return redirect("orders_cart")
 
 
+@method_decorator(idempotent, name="post")
 class CheckoutPage(LoginRequiredMixin, FormView):
     """
     Creates an Order from current cart and redirects to Zarinpal.
@@ -61,85 +59,62 @@ class CheckoutPage(LoginRequiredMixin, FormView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        items = CartItem.objects.select_related("product").filter(user=self.request.user)
-        total_price = sum((ci.product.price or 0) * ci.quantity for ci in items)
+        items = CartService.for_request(self.request).lines()
         ctx["items"] = items
-        ctx["total_price"] = total_price
+        ctx["total_price"] = CartService.total_price(items)
         return ctx
 
-    @transaction.atomic
     def form_valid(self, form):
         user = self.request.user
-        cart_items = list(CartItem.objects.select_related("product").filter(user=user))
+        cart_items = CartService.for_user(user).lines()
         if not cart_items:
             messages.error(self.request, "سبد خرید خالی است.")
             return redirect("orders_cart")
 
-        total_price = sum((ci.product.price or 0) * ci.quantity for ci in cart_items)
-
-        # Create order + items
-        order = Order.objects.create(
-            user=user,
-            total_price=total_price,
-            address=form.cleaned_data["address"],
-            location=form.cleaned_data.get("location") or "",
-            status="pending",
-        )
-        OrderItem.objects.bulk_create([
-            OrderItem(order=order, product=ci.product, quantity=ci.quantity) for ci in cart_items
-        ])
-
-        # optionally clear cart
-        CartItem.objects.filter(user=user).delete()
-
-        # Start Zarinpal payment (redirect)
-        gateway = ZarinpalGateway(
-            merchant_id=getattr(settings, "ZARINPAL_MERCHANT_ID", "your-merchant-id"),
-            sandbox=getattr(settings, "ZARINPAL_SANDBOX", True),
-        )
-        callback_url = getattr(settings, "ZARINPAL_CALLBACK", "")
-        phone = getattr(user, "phone_number", "")
-        result = gateway.request_payment(
-            amount=order.total_price,
-            description=f"Order #{order.id}",
-            callback_url=callback_url,
-            phone=phone,
-        )
-
-        if result.get("status") == 100:
-            order.authority = result["authority"]
-            order.save(update_fields=["authority"])
-            return redirect(result["url"])
-
-        messages.error(self.request, "خطا در اتصال به زرین‌پال.")
+        # short transaction: order + items are committed before talking to the gateway
+        try:
+            order = place_order(
+                user, cart_items,
+                address=form.cleaned_data["address"],
+                location=form.cleaned_data.get("location"),
+            )
+        except OutOfStock:
+            messages.error(self.request, "موجودی برخی از محصولات سبد کافی نیست.")
+            return redirect("orders_cart")
+
+        # Start Zarinpal payment (redirect), outside the transaction
+        try:
+            return redirect(request_order_payment(order))
+        except GatewayUnavailable:
+            fail_checkout(order)
+            messages.error(self.request, "درگاه پرداخت در دسترس نیست؛ لطفاً چند دقیقه دیگر دوباره تلاش کنید.")
+        except (ZarinpalError, ValueError):
+            fail_checkout(order)
+            messages.error(self.request, "خطا در اتصال به زرین‌پال.")
         return redirect("orders_cart")
 
 
 class ZarinpalVerifyView(View):
     """
     Callback endpoint from Zarinpal (configured in settings.ZARINPAL_CALLBACK).
+    Records the callback and queues verification (orders.tasks.verify_payment_task),
+    so no gateway round trip happens in the customer's redirect.
     It redirects to SUCCESS/FAIL URLs defined in settings.
     """
     def get(self, request):
         authority = request.GET.get("Authority")
         status_param = request.GET.get("Status")
 
-        order = Order.objects.filter(authority=authority).first()
+        order, first = record_callback(authority, status_param)
         if not order:
             messages.error(request, "سفارش پیدا نشد.")
             return redirect(getattr(settings, "ZARINPAL_FAIL_URL", "/"))
 
-        gateway = ZarinpalGateway(
-            merchant_id=getattr(settings, "ZARINPAL_MERCHANT_ID", "your-merchant-id"),
-            sandbox=getattr(settings, "ZARINPAL_SANDBOX", True),
-        )
-        result = gateway.verify_payment(order.total_price, authority)
+        if first and order.status == "pending":
+            verify_payment_task.delay(order.pk)
 
-        if result.get("status") == 100:
-            order.status = "paid"
-            order.save(update_fields=["status"])
-            return redirect(getattr(settings, "ZARINPAL_SUCCESS_URL", "/"))
-        else:
-            order.status = "failed"
-            order.save(update_fields=["status"])
+        if order.status == "failed":
             return redirect(getattr(settings, "ZARINPAL_FAIL_URL", "/"))
+        if order.status == "pending":
+            messages.info(request, "پرداخت دریافت شد و در حال تأیید است.")
+        return redirect(getattr(settings, "ZARINPAL_SUCCESS_URL", "/"))
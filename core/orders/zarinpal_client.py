@@ -1,41 +1,267 @@
+"""
+Zarinpal (v4 REST) client.
+
+One ZarinpalGateway per process (get_gateway()) keeps a pooled keep-alive
+requests.Session, so checkouts reuse TCP/TLS connections. Every call has a
+connect/read timeout; idempotent calls (verify, inquiry) are retried a bounded
+number of times with jittered exponential backoff. A circuit breaker fails
+fast with GatewayUnavailable while the gateway keeps failing, and
+`gateway.stats.snapshot()` exposes per-operation latency/error counters.
+
+For local runs point ZARINPAL_BASE_URL at the stub server
+(orders.zarinpal_stub, `manage.py run_zarinpal_stub`).
+"""
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+SANDBOX_URL = "https://sandbox.zarinpal.com/pg/v4"
+PRODUCTION_URL = "https://www.zarinpal.com/pg/v4"
+
+CODE_OK = 100
+CODE_ALREADY_VERIFIED = 101
+# verify errors that mean the customer did not pay: amount mismatch, payment
+# not successful, unknown authority. Any other error is not an answer about
+# the payment, so the order stays pending.
+VERIFY_DECLINED_CODES = (-50, -51, -54)
+
+
+class ZarinpalError(Exception):
+    """The gateway answered, but with an error code."""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class GatewayUnavailable(ZarinpalError):
+    """Timeout / connection failure / 5xx, or the circuit breaker is open."""
+
+
+# =====================================
+# Circuit breaker + counters
+# =====================================
+
+class CircuitBreaker:
+    """
+    closed -> (failure_threshold consecutive failures) -> open
+    open -> (reset_timeout seconds) -> half-open: one trial call
+    half-open -> success: closed / failure: open again
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class GatewayStats:
+    """Thread-safe per-operation counters (process-local)."""
+    FIELDS = ("calls", "errors", "timeouts", "retries", "short_circuited", "latency_ms_total", "latency_ms_max")
 
+    def __init__(self):
+        self._ops = {}
+        self._lock = threading.Lock()
+
+    def _op(self, op):
+        return self._ops.setdefault(op, dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, op, field, n=1):
+        with self._lock:
+            self._op(op)[field] += n
+
+    def observe(self, op, seconds):
+        ms = round(seconds * 1000, 1)
+        with self._lock:
+            c = self._op(op)
+            c["calls"] += 1
+            c["latency_ms_total"] += ms
+            c["latency_ms_max"] = max(c["latency_ms_max"], ms)
+
+    def snapshot(self):
+        with self._lock:
+            out = {}
+            for op, c in self._ops.items():
+                out[op] = {**c, "latency_ms_avg": round(c["latency_ms_total"] / c["calls"], 1) if c["calls"] else 0}
+            return out
+
+
+# =====================================
+# Client
+# =====================================
 
 class ZarinpalGateway:
-    def __init__(self, merchant_id: str, sandbox: bool = True):
+    def __init__(self, merchant_id: str, sandbox: bool = True, base_url: str = None,
+                 connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 max_retries: int = 2, backoff: float = 0.3, pool_size: int = 20,
+                 breaker: CircuitBreaker = None):
         self.merchant_id = merchant_id
         self.sandbox = sandbox
-        self.base_url = "https://sandbox.zarinpal.com/pg/v4" if sandbox else "https://www.zarinpal.com/pg/v4"
+        self.base_url = (base_url or (SANDBOX_URL if sandbox else PRODUCTION_URL)).rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = GatewayStats()
+
+        self.session = requests.Session()
+        # retries are done here (only for idempotent calls), not by urllib3
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+
+    def start_pay_url(self, authority: str) -> str:
+        parts = urlsplit(self.base_url)
+        return f"{parts.scheme}://{parts.netloc}/pg/StartPay/{authority}"
+
+    # ---------- transport ----------
+
+    def _sleep_before_retry(self, attempt):
+        # exponential backoff with +-50% jitter so workers don't retry in lockstep
+        time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def _post(self, op: str, path: str, payload: dict, idempotent: bool) -> dict:
+        if not self.breaker.allow():
+            self.stats.incr(op, "short_circuited")
+            raise GatewayUnavailable("Zarinpal circuit open")
 
-    def request_payment(self, amount, callback_url, description, metadata=None):
-        url = f"{self.base_url}/payment/request.json"
-        data = {
+        attempts = 1 + (self.max_retries if idempotent else 0)
+        last_error = None
+        for attempt in range(attempts):
+            if attempt:
+                self.stats.incr(op, "retries")
+                self._sleep_before_retry(attempt - 1)
+            started = time.monotonic()
+            try:
+                response = self.session.post(f"{self.base_url}/{path}", json=payload, timeout=self.timeout)
+            except requests.Timeout as e:
+                self.stats.observe(op, time.monotonic() - started)
+                self.stats.incr(op, "timeouts")
+                last_error = e
+                continue
+            except requests.RequestException as e:
+                self.stats.observe(op, time.monotonic() - started)
+                self.stats.incr(op, "errors")
+                last_error = e
+                continue
+            self.stats.observe(op, time.monotonic() - started)
+
+            if response.status_code >= 500:
+                self.stats.incr(op, "errors")
+                last_error = ZarinpalError(f"HTTP {response.status_code}")
+                continue
+
+            self.breaker.record_success()
+            try:
+                return response.json()
+            except ValueError:
+                self.stats.incr(op, "errors")
+                raise ZarinpalError(f"Invalid response (HTTP {response.status_code})")
+
+        self.breaker.record_failure()
+        raise GatewayUnavailable(f"Zarinpal {op} failed: {last_error}")
+
+    def _data_or_raise(self, op, result, ok_codes):
+        data = result.get("data") or {}
+        code = data.get("code") if isinstance(data, dict) else None
+        if code in ok_codes:
+            return data
+        errors = result.get("errors") or {}
+        if isinstance(errors, dict):
+            code = errors.get("code", code)
+        self.stats.incr(op, "errors")
+        raise ZarinpalError(f"Zarinpal {op} error: {errors or result}", code=code)
+
+    # ---------- API ----------
+
+    def request_payment(self, amount, callback_url, description, phone=None, email=None, metadata=None):
+        """-> {"status": 100, "authority", "url"}. Not retried: each call creates a new authority."""
+        meta = dict(metadata or {})
+        if phone:
+            meta.setdefault("mobile", phone)
+        if email:
+            meta.setdefault("email", email)
+        result = self._post("request", "payment/request.json", {
             "merchant_id": self.merchant_id,
-            "amount": amount,
+            "amount": int(amount),
             "callback_url": callback_url,
             "description": description,
-            "metadata": metadata or {"email": "", "mobile": ""},
-        }
-        response = requests.post(url, json=data)
-        result = response.json()
-        if response.status_code == 200 and result.get("data"):
-            return {
-                "authority": result["data"]["authority"],
-                "url": f"https://sandbox.zarinpal.com/pg/StartPay/{result['data']['authority']}"
-                if self.sandbox
-                else f"https://www.zarinpal.com/pg/StartPay/{result['data']['authority']}"
-            }
-        raise Exception(f"Zarinpal Request Error: {result.get('errors', result)}")
+            "metadata": meta,
+        }, idempotent=False)
+        data = self._data_or_raise("request", result, ok_codes=(CODE_OK,))
+        return {"status": CODE_OK, "authority": data["authority"], "url": self.start_pay_url(data["authority"])}
 
     def verify_payment(self, authority, amount):
-        url = f"{self.base_url}/payment/verify.json"
-        data = {
+        """-> {"status": 100 | 101 (already verified), "ref_id", "card_pan", ...}. Idempotent, retried."""
+        result = self._post("verify", "payment/verify.json", {
             "merchant_id": self.merchant_id,
             "authority": authority,
-            "amount": amount,
-        }
-        response = requests.post(url, json=data)
-        result = response.json()
-        if response.status_code == 200 and result.get("data") and result["data"]["code"] == 100:
-            return result["data"]
-        raise Exception(f"Zarinpal Verify Error: {result.get('errors', result)}")
+            "amount": int(amount),
+        }, idempotent=True)
+        data = self._data_or_raise("verify", result, ok_codes=(CODE_OK, CODE_ALREADY_VERIFIED))
+        return {**data, "status": data["code"]}
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> ZarinpalGateway:
+    """The process-wide client (connection pool, breaker and counters are shared)."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = ZarinpalGateway(
+                    merchant_id=getattr(settings, "ZARINPAL_MERCHANT_ID", "your-merchant-id"),
+                    sandbox=getattr(settings, "ZARINPAL_SANDBOX", True),
+                    base_url=getattr(settings, "ZARINPAL_BASE_URL", None),
+                    connect_timeout=getattr(settings, "ZARINPAL_CONNECT_TIMEOUT", 3.05),
+                    read_timeout=getattr(settings, "ZARINPAL_READ_TIMEOUT", 10.0),
+                    max_retries=getattr(settings, "ZARINPAL_MAX_RETRIES", 2),
+                )
+    return _gateway
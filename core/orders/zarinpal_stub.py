@@ -0,0 +1,181 @@
+"""
+Local stand-in for the Zarinpal v4 REST API, for tests and local checkout runs.
+
+    server = StubZarinpalServer()         # binds 127.0.0.1 on a free port
+    with server:                           # serves from a background thread
+        gw = ZarinpalGateway("merchant", base_url=server.base_url)
+        ...
+
+or `manage.py run_zarinpal_stub --port 8765` with
+ZARINPAL_BASE_URL = "http://127.0.0.1:8765/pg/v4".
+
+Implements payment/request.json, payment/verify.json, payment/inquiry.json and
+the StartPay page (which redirects straight back to the callback with
+Status=OK, or NOK with ?fail=1). `latency`, `fail_next` and `status_code`
+let tests simulate a slow or broken gateway.
+"""
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ZarinpalStub/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.stub.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            payload = {}
+        stub.calls.append((self.path, payload))
+
+        if stub.latency:
+            time.sleep(stub.latency)
+        with stub.lock:
+            failing = stub.fail_next > 0
+            if failing:
+                stub.fail_next -= 1
+        if failing or stub.status_code >= 500:
+            return self._reply(stub.status_code if stub.status_code >= 500 else 503, {"errors": "stub failure"})
+
+        status, result = stub.handle(urlsplit(self.path).path, payload)
+        self._reply(status, result)
+
+    def do_GET(self):
+        # /pg/StartPay/<authority>: pretend the customer paid (or cancelled with ?fail=1)
+        parts = urlsplit(self.path)
+        authority = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        payment = self.server.stub.payments.get(authority)
+        if not parts.path.startswith("/pg/StartPay/") or not payment:
+            self.send_response(404)
+            self.end_headers()
+            return
+        ok = "fail" not in parse_qs(parts.query)
+        sep = "&" if "?" in payment["callback_url"] else "?"
+        target = payment["callback_url"] + sep + urlencode({"Authority": authority, "Status": "OK" if ok else "NOK"})
+        payment["paid"] = ok
+        self.send_response(302)
+        self.send_header("Location", target)
+        self.end_headers()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients that time out hang up before the (delayed) answer: expected here
+        if self.stub.verbose:
+            super().handle_error(request, client_address)
+
+
+class StubZarinpalServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, verbose=False):
+        self.latency = latency
+        self.verbose = verbose
+        self.fail_next = 0        # the next N POSTs answer 503
+        self.status_code = 200    # >= 500: every POST fails with it
+        self.payments = {}        # authority -> {"amount", "callback_url", "paid", "verified", "ref_id"}
+        self.calls = []           # [(path, payload)]
+        self.lock = threading.Lock()
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/pg/v4"
+
+    # ---------- API ----------
+
+    def handle(self, path, payload):
+        if path.endswith("/payment/request.json"):
+            return self._request(payload)
+        if path.endswith("/payment/verify.json"):
+            return self._verify(payload)
+        if path.endswith("/payment/inquiry.json"):
+            return self._inquiry(payload)
+        return 404, {"data": [], "errors": {"code": -1, "message": "not found"}}
+
+    @staticmethod
+    def _error(code, message):
+        return 200, {"data": [], "errors": {"code": code, "message": message, "validations": []}}
+
+    def _request(self, payload):
+        if not payload.get("merchant_id"):
+            return self._error(-9, "The input params invalid, validation error.")
+        if int(payload.get("amount") or 0) < 1000:
+            return self._error(-9, "The amount must be at least 1000.")
+        authority = "A" + secrets.token_hex(18)[:35].upper()
+        with self.lock:
+            self.payments[authority] = {
+                "amount": int(payload["amount"]), "callback_url": payload.get("callback_url", ""),
+                "paid": None, "verified": False, "ref_id": None,
+            }
+        return 200, {"data": {"code": 100, "message": "Success", "authority": authority,
+                              "fee_type": "Merchant", "fee": 0}, "errors": []}
+
+    def _verify(self, payload):
+        with self.lock:
+            payment = self.payments.get(payload.get("authority"))
+            if not payment:
+                return self._error(-51, "Session is not valid, session is not active paid try.")
+            if int(payload.get("amount") or 0) != payment["amount"]:
+                return self._error(-50, "Session is not valid, amounts values is not the same.")
+            if not payment["paid"]:
+                return self._error(-51, "Session is not valid, session is not active paid try.")
+            code = 101 if payment["verified"] else 100
+            payment["verified"] = True
+            payment["ref_id"] = payment["ref_id"] or secrets.randbelow(10 ** 9)
+            ref_id = payment["ref_id"]
+        return 200, {"data": {"code": code, "message": "Verified" if code == 100 else "Verified before",
+                              "card_hash": "", "card_pan": "502229******5995", "ref_id": ref_id,
+                              "fee_type": "Merchant", "fee": 0}, "errors": []}
+
+    def _inquiry(self, payload):
+        payment = self.payments.get(payload.get("authority"))
+        if not payment:
+            return self._error(-51, "Session is not valid.")
+        if payment["verified"]:
+            status = "VERIFIED"
+        elif payment["paid"]:
+            status = "PAID"
+        elif payment["paid"] is False:
+            status = "FAILED"
+        else:
+            status = "IN_BANK"
+        return 200, {"data": {"code": 100, "message": "Success", "status": status}, "errors": []}
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
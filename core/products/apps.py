@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "products"
+
+    def ready(self):
+        import products.signals  # keeps Product.search_vector and the detail read model in sync
+        import core.trigram  # pg_trgm extension (pre_migrate) + per-connection thresholds
@@ -0,0 +1,302 @@
+"""
+Facet counts for the product list.
+
+Filters come from the query string:
+
+    ?q=…&category=<uuid|slug>&brand=<name>&brand=<name>&price=<lo>-<hi>&featured=1&f=<feature key>:<value>
+
+`q` and `category` narrow the base set; brand, price band, featured and the
+FACET_FEATURE_KEYS entries of Product.features (e.g. "عیار") are facets.
+facet_counts() computes every facet in ONE grouped query (GROUPING SETS over
+the filtered set). Counts are disjunctive: a facet's counts apply every
+filter except its own, so picking a brand still shows the other brands.
+
+Counts are cached per normalized filter signature; the cache is stamped with
+a version that products.signals bumps when products or brands change.
+"""
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.fields.json import KeyTextTransform
+
+from categories.models import Category
+
+from .models.brand import Brand
+from .models.product import Product
+from .search import normalize_persian
+
+# lower bounds of the price bands; the last band is open-ended
+DEFAULT_PRICE_BOUNDS = (0, 5_000_000, 10_000_000, 20_000_000, 50_000_000)
+DEFAULT_FEATURE_KEYS = ("عیار",)
+FACET_TTL = 300
+FACET_LIMIT = 50  # values shown per facet
+VERSION_CACHE_KEY = "facets:version"
+
+
+def price_bounds():
+    return tuple(getattr(settings, "FACET_PRICE_BOUNDS", DEFAULT_PRICE_BOUNDS))
+
+
+def feature_keys():
+    return tuple(getattr(settings, "FACET_FEATURE_KEYS", DEFAULT_FEATURE_KEYS))
+
+
+def price_bands():
+    """[(value, lo, hi)] with hi None for the last band, value like "5000000-10000000"."""
+    bounds = price_bounds()
+    bands = []
+    for i, lo in enumerate(bounds):
+        hi = bounds[i + 1] if i + 1 < len(bounds) else None
+        bands.append((f"{lo}-{hi if hi is not None else ''}", lo, hi))
+    return bands
+
+
+# =====================================
+# Filters
+# =====================================
+
+@dataclass
+class FacetFilters:
+    q: str = ""
+    category: Category = None
+    brands: tuple = ()        # lower-cased names
+    price: str = None         # a price_bands() value
+    featured: bool = False
+    features: tuple = ()      # sorted ((key, value), ...)
+    params: dict = field(default_factory=dict, repr=False)  # the raw query (for toggle links)
+
+    def signature(self) -> dict:
+        return {
+            "q": normalize_persian(self.q),
+            "category": str(self.category.pk) if self.category else None,
+            "brands": sorted(self.brands),
+            "price": self.price,
+            "featured": self.featured,
+            "features": [list(kv) for kv in self.features],
+        }
+
+    def querystring(self) -> str:
+        """The filters as a query string (for pagination links)."""
+        return urlencode(self.params, doseq=True)
+
+    def predicates(self) -> dict:
+        """facet name -> Q the results must match (only for facets with a selection)."""
+        preds = {}
+        if self.brands:
+            q = Q()
+            for name in self.brands:
+                q |= Q(brand__name__iexact=name)
+            preds["brand"] = q
+        if self.price:
+            _, lo, hi = next(b for b in price_bands() if b[0] == self.price)
+            preds["price"] = Q(price__gte=lo) & (Q(price__lt=hi) if hi is not None else Q())
+        if self.featured:
+            preds["featured"] = Q(featured=True)
+        for key in feature_keys():
+            values = [v for k, v in self.features if k == key]
+            if values:
+                preds[f"feature:{key}"] = Q(**{f"_fv{feature_keys().index(key)}__in": values})
+        return preds
+
+
+def parse_filters(params, category=None) -> FacetFilters:
+    """QueryDict -> FacetFilters; unknown bands/feature keys are dropped, so cache keys stay bounded."""
+    bands = {value for value, _, _ in price_bands()}
+    price = params.get("price")
+    keys = set(feature_keys())
+    features = set()
+    for raw in params.getlist("f"):
+        key, sep, value = raw.partition(":")
+        if sep and key in keys and value:
+            features.add((key, value))
+    return FacetFilters(
+        q=(params.get("q") or "").strip(),
+        category=category,
+        brands=tuple(sorted({b.strip().lower() for b in params.getlist("brand") if b.strip()})),
+        price=price if price in bands else None,
+        featured=params.get("featured") in {"1", "true", "True"},
+        features=tuple(sorted(features)),
+        params={k: params.getlist(k) for k in params if k not in ("cursor", "page")},
+    )
+
+
+def _with_feature_values(qs):
+    return qs.annotate(**{f"_fv{i}": KeyTextTransform(key, "features") for i, key in enumerate(feature_keys())})
+
+
+def _base(qs, filters, ranked):
+    if filters.category:
+        qs = qs.in_category(filters.category)
+    if filters.q:
+        # GIN-indexed full-text search, best matches first (products.search)
+        qs = qs.search(filters.q, ranked=ranked)
+    return qs
+
+
+def apply_filters(qs, filters, ranked=True):
+    """`qs` narrowed to the results of `filters` (the listing's rows)."""
+    qs = _base(qs, filters, ranked)
+    preds = filters.predicates()
+    if any(name.startswith("feature:") for name in preds):
+        qs = _with_feature_values(qs)
+    for q in preds.values():
+        qs = qs.filter(q)
+    return qs
+
+
+# =====================================
+# Counts
+# =====================================
+
+def _version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def bump_version():
+    """Drop every cached facet count (products.signals, after commit)."""
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def facet_counts(filters) -> dict:
+    """Cached _count() for the normalized signature of `filters`."""
+    raw = json.dumps(filters.signature(), sort_keys=True, ensure_ascii=False)
+    key = f"facets:{_version()}:{hashlib.sha1(raw.encode()).hexdigest()}"
+    counts = cache.get(key)
+    if counts is None:
+        counts = _count(filters)
+        cache.set(key, counts, FACET_TTL)
+    return counts
+
+
+def _count(filters) -> dict:
+    """
+    One query: the base set (q + category) with one boolean column per
+    selected facet, grouped by GROUPING SETS ((brand), (category), (price
+    band), (featured), (each feature key)). Each facet's count aggregate is
+    FILTERed by the other facets' booleans.
+    """
+    keys = feature_keys()
+    preds = filters.predicates()
+    quote = connection.ops.quote_name
+    inner = _with_feature_values(_base(Product.objects.filter(is_active=True), filters, ranked=False))
+    inner = inner.annotate(
+        _band=RawSQL(f"width_bucket({quote(Product._meta.db_table)}.price, %s::numeric[])", (list(price_bounds()),)),
+        **{f"_m{i}": ExpressionWrapper(q, output_field=BooleanField()) for i, q in enumerate(preds.values())},
+    ).order_by().values("id", "brand_id", "featured", "_band", *[f"_fv{i}" for i in range(len(keys))],
+                        *[f"_m{i}" for i in range(len(preds))])
+
+    pred_cols = {name: f"s._m{i}" for i, name in enumerate(preds)}
+
+    def counted(facet):
+        others = [col for name, col in pred_cols.items() if name != facet]
+        return f"count(DISTINCT s.id) FILTER (WHERE {' AND '.join(others) or 'TRUE'})"
+
+    # (facet, grouping column, label columns carried along)
+    dims = [
+        ("brand", "s.brand_id", ["br.name"]),
+        ("category", "pc.category_id", ["c.name", "c.slug"]),
+        ("price", "s._band", []),
+        ("featured", "s.featured", []),
+    ] + [(f"feature:{k}", f"s._fv{i}", []) for i, k in enumerate(keys)]
+    found = {name: {} for name, _, _ in dims}
+    try:
+        inner_sql, inner_params = inner.query.sql_with_params()
+    except EmptyResultSet:
+        # nothing can match (e.g. "?q=!!!" has no searchable token: search_products() returns none())
+        return _labelled(found, keys)
+
+    selected = [col for _, col, labels in dims for col in [col, *labels]]
+    sql = f"""
+        SELECT {", ".join(f"GROUPING({col})" for _, col, _ in dims)},
+               {", ".join(selected)},
+               {", ".join(counted(name) for name, _, _ in dims)}
+        FROM ({inner_sql}) s
+        LEFT JOIN {quote(Brand._meta.db_table)} br ON br.id = s.brand_id
+        LEFT JOIN {quote(Product.categories.through._meta.db_table)} pc ON pc.product_id = s.id
+        LEFT JOIN {quote(Category._meta.db_table)} c ON c.id = pc.category_id AND c.is_active
+        GROUP BY GROUPING SETS ({", ".join(f"({', '.join([col, *labels])})" for _, col, labels in dims)})
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, inner_params)
+        rows = cursor.fetchall()
+
+    n = len(dims)
+    for row in rows:
+        grouping, values, counts = row[:n], row[n:n + len(selected)], row[n + len(selected):]
+        i = grouping.index(0)  # the one dimension this row is grouped by
+        offset = sum(1 + len(labels) for _, _, labels in dims[:i])
+        value, labels = values[offset], values[offset + 1:offset + 1 + len(dims[i][2])]
+        if value is not None and counts[i] and None not in labels:
+            found[dims[i][0]][value] = (counts[i], *labels)
+    return _labelled(found, keys)
+
+
+def _top(found):
+    return sorted(found.items(), key=lambda kv: (-kv[1][0], str(kv[0])))[:FACET_LIMIT]
+
+
+def _labelled(found, keys) -> dict:
+    bands = price_bands()
+    return {
+        "brands": [{"value": name, "count": n} for _, (n, name) in _top(found["brand"])],
+        "categories": [{"value": str(pk), "name": name, "slug": slug, "count": n}
+                       for pk, (n, name, slug) in _top(found["category"])],
+        "price": [{"value": bands[b - 1][0], "min": bands[b - 1][1], "max": bands[b - 1][2], "count": n}
+                  for b, (n,) in sorted(found["price"].items()) if 1 <= b <= len(bands)],
+        "featured": found["featured"].get(True, (0,))[0],
+        "features": {key: [{"value": v, "count": n} for v, (n,) in _top(found[f"feature:{key}"])] for key in keys},
+    }
+
+
+# =====================================
+# Links (templates)
+# =====================================
+
+def _toggle(filters, param, value, selected, single=False):
+    params = {k: list(v) for k, v in filters.params.items()}
+    current = params.get(param, [])
+    if selected:
+        # single-valued params may hold another spelling (category slug vs id, brand case)
+        params[param] = [] if single else [v for v in current if v.lower() != value.lower()]
+    else:
+        params[param] = [value] if single else current + [value]
+    return "?" + urlencode({k: v for k, v in params.items() if v}, doseq=True)
+
+
+def _linked(entries, filters, param, is_selected, value=lambda e: e["value"], single=False):
+    out = []
+    for entry in entries:
+        selected = is_selected(entry)
+        out.append({**entry, "selected": selected, "url": _toggle(filters, param, value(entry), selected, single)})
+    return out
+
+
+def with_links(counts, filters) -> dict:
+    """The cached counts plus, per value, "selected" and the "url" that toggles it."""
+    category = str(filters.category.pk) if filters.category else None
+    return {
+        "brands": _linked(counts["brands"], filters, "brand", lambda b: b["value"].lower() in filters.brands),
+        "categories": _linked(counts["categories"], filters, "category", lambda c: c["value"] == category,
+                              single=True),
+        "price": _linked(counts["price"], filters, "price", lambda p: p["value"] == filters.price, single=True),
+        "featured": {"count": counts["featured"], "selected": filters.featured,
+                     "url": _toggle(filters, "featured", "1", filters.featured, single=True)},
+        "features": {
+            key: _linked(values, filters, "f", lambda f, key=key: (key, f["value"]) in filters.features,
+                         value=lambda f, key=key: f"{key}:{f['value']}")
+            for key, values in counts["features"].items() if values
+        },
+    }
@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from products.models.product import Product
+from products.search import build_search_vector
+
+
+class Command(BaseCommand):
+    help = "Rebuilds Product.search_vector (full-text index) for all products, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Products per transaction.")
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+        fields = ["id", "name", "english_name", "short_description", "description", "features"]
+        last_id = 0
+        done = 0
+        while True:
+            batch = list(Product.objects.filter(id__gt=last_id).order_by("id").only(*fields)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                for product in batch:
+                    Product.objects.filter(pk=product.pk).update(search_vector=build_search_vector(product))
+            last_id = batch[-1].id
+            done += len(batch)
+            self.stdout.write(f"  … {done} products indexed")
+        self.stdout.write(self.style.SUCCESS(f"✅ Search index rebuilt for {done} products."))
@@ -1,8 +1,34 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from categories.models import Category
 from products.models.brand import Brand
 
 
+class ProductQuerySet(models.QuerySet):
+    # what a product card draws (plus created_at, the keyset pagination key);
+    # description / features / images / rel_* and the search vector stay in the table
+    CARD_FIELDS = ("id", "name", "price", "featured", "view_image", "created_at", "brand__id", "brand__name")
+
+    def cards(self):
+        """Slim rows for listing pages: card fields only, brand name joined in the same query."""
+        return self.select_related("brand").only(*self.CARD_FIELDS)
+
+    def in_category(self, category, include_descendants=True):
+        """
+        Products linked (M2M) to `category`, optionally including all its sub-categories.
+        The descendant case is a single join on the indexed Category.path prefix.
+        """
+        if not include_descendants or not category.path:
+            return self.filter(categories=category)
+        return self.filter(categories__path__startswith=category.path).distinct()
+
+    def search(self, q, ranked=True):
+        """Full-text search (see products.search); ranked=True orders by relevance."""
+        from products.search import search_products
+        return search_products(self, q, ranked=ranked)
+
+
 class Product(models.Model):
     name = models.CharField(max_length=255)
     english_name = models.CharField(max_length=255)
@@ -14,6 +40,9 @@ class Product(models.Model):
 
     owner_name = models.CharField(max_length=255)
     owner_profile = models.URLField()
+    # selling account; drives the seller dashboard analytics
+    seller = models.ForeignKey('accounts.User', null=True, blank=True, on_delete=models.SET_NULL,
+                               related_name='seller_products', limit_choices_to={'role': 'seller'})
 
     short_description = models.TextField()
     description = models.TextField()
@@ -33,5 +62,20 @@ class Product(models.Model):
     brand = models.ForeignKey(Brand, null=True, blank=True, on_delete=models.SET_NULL, related_name='products')
     is_active = models.BooleanField(default=True)  # ✅ Add this line
 
+    # maintained by products.signals (see products.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="product_search_vector_gin"),
+            GinIndex(fields=["name"], name="product_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["english_name"], name="product_en_name_trgm", opclasses=["gin_trgm_ops"]),
+            # keyset pagination of the storefront list (core.pagination)
+            models.Index(fields=["-created_at", "-id"], name="product_active_created_idx",
+                         condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,117 @@
+"""
+Product detail read model.
+
+A product page needs the product, its brand, its categories and the
+rel_products / rel_blogs / rel_news id lists resolved into titles — five
+queries. get_product_detail() keeps all of it as one JSON-ready dict in the
+cache, so a page view is a single cache lookup:
+
+    {"id", "name", "english_name", "price", "featured", "is_active",
+     "short_description", "description", "features", "view_image", "images",
+     "brand": {"id", "name"} | None, "categories": [{"id", "name", "slug"}],
+     "rel_products" / "rel_blogs" / "rel_news": [{"id", "name"}]}
+
+products.signals drops the entry (after commit) when the product, its
+categories, its brand or any product/blog/news it links to is saved or
+deleted; the next view rebuilds it.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models.product import Product
+
+# bump when the shape above changes, so old entries are ignored
+DETAIL_VERSION = 1
+DETAIL_TTL = 24 * 3600  # invalidation is event-driven; the TTL is only a safety net
+
+
+def detail_key(product_id) -> str:
+    return f"product:detail:v{DETAIL_VERSION}:{product_id}"
+
+
+def _ids(value):
+    """rel_* JSON lists hold ids as ints or strings (select2 posts strings); anything else is ignored."""
+    if isinstance(value, (int, str)):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    ids = []
+    for item in value:
+        try:
+            ids.append(int(item))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def _titles(model, ids, **filters):
+    """[{"id", "name"}] in the order of `ids`; missing rows are left out."""
+    if not ids:
+        return []
+    names = dict(model.objects.filter(pk__in=ids, **filters).values_list("pk", "name"))
+    return [{"id": pk, "name": names[pk]} for pk in dict.fromkeys(ids) if pk in names]
+
+
+def build_detail(product) -> dict:
+    """The projection of `product` (brand/categories should be select/prefetch-related)."""
+    from blogs.models.blog import Blog
+    from news.models.news import News
+
+    brand = product.brand
+    return {
+        "id": product.pk,
+        "name": product.name,
+        "english_name": product.english_name,
+        "price": int(product.price or 0),
+        "featured": product.featured,
+        "is_active": product.is_active,
+        "short_description": product.short_description,
+        "description": product.description,
+        "features": product.features if isinstance(product.features, dict) else {},
+        "view_image": product.view_image.url if product.view_image else "",
+        "images": product.images if isinstance(product.images, list) else [],
+        "brand": {"id": brand.pk, "name": brand.name} if brand else None,
+        "categories": [
+            {"id": str(c.pk), "name": c.name, "slug": c.slug}
+            for c in product.categories.all()
+        ],
+        "rel_products": _titles(Product, [pk for pk in _ids(product.rel_products) if pk != product.pk],
+                                is_active=True),
+        "rel_blogs": _titles(Blog, _ids(product.rel_blogs)),
+        "rel_news": _titles(News, _ids(product.rel_news)),
+    }
+
+
+def get_product_detail(product_id):
+    """-> the cached projection, built on a miss; None if the product doesn't exist."""
+    key = detail_key(product_id)
+    detail = cache.get(key)
+    if detail is None:
+        product = (Product.objects.select_related("brand").prefetch_related("categories")
+                   .filter(pk=product_id).first())
+        if product is None:
+            return None
+        detail = build_detail(product)
+        cache.set(key, detail, DETAIL_TTL)
+    return detail
+
+
+# =====================================
+# Invalidation (products.signals)
+# =====================================
+
+def invalidate(product_ids):
+    """Drop the projections of `product_ids` once the current transaction commits."""
+    keys = [detail_key(pk) for pk in set(product_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def referencing(field, pk):
+    """Ids of products whose `field` (rel_products / rel_blogs / rel_news) lists `pk`."""
+    return list(
+        Product.objects
+        .filter(Q(**{f"{field}__contains": [pk]}) | Q(**{f"{field}__contains": [str(pk)]}))
+        .values_list("pk", flat=True)
+    )
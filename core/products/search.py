@@ -0,0 +1,101 @@
+"""
+Full-text search for products.
+
+Each product keeps a weighted tsvector in Product.search_vector (GIN-indexed),
+rebuilt on save from name, english_name, short_description, description and the
+flattened features JSON. Text is normalized before it reaches Postgres so that
+Arabic/Persian letter variants, ZWNJ and Persian digits all match each other.
+Postgres has no Persian dictionary, so the 'simple' config is used throughout.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, Value
+
+SEARCH_CONFIG = "simple"
+
+_CHAR_MAP = str.maketrans({
+    "ي": "ی",  # Arabic yeh -> Persian yeh
+    "ى": "ی",  # alef maksura
+    "ك": "ک",  # Arabic kaf -> Persian kaf
+    "ة": "ه",
+    "ۀ": "ه",
+    "أ": "ا",
+    "إ": "ا",
+    "ٱ": "ا",
+    "ؤ": "و",
+    "\u200c": " ",  # ZWNJ (nim-fasele) -> space, so "می‌شود" == "می شود"
+    "\u200f": None,  # RLM
+    "\u200e": None,  # LRM
+    "ـ": None,  # tatweel
+    **{d: str(i) for i, d in enumerate("۰۱۲۳۴۵۶۷۸۹")},
+    **{d: str(i) for i, d in enumerate("٠١٢٣٤٥٦٧٨٩")},
+})
+# Arabic diacritics (fatha, kasra, tanwin, shadda, sukun, ...)
+_DIACRITICS_RE = re.compile(r"[\u064b-\u065f\u0670]")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# field -> tsvector weight
+DOCUMENT_WEIGHTS = (
+    ("name", "A"),
+    ("english_name", "A"),
+    ("short_description", "B"),
+    ("features", "C"),
+    ("description", "D"),
+)
+
+
+def normalize_persian(text) -> str:
+    """Fold Persian/Arabic spelling variants and digits into one canonical form."""
+    if text is None:
+        return ""
+    text = _DIACRITICS_RE.sub("", str(text).translate(_CHAR_MAP))
+    return " ".join(text.lower().split())
+
+
+def flatten_features(features) -> str:
+    """{featureName: featureDesc} (or list/str) -> plain text."""
+    if isinstance(features, dict):
+        return " ".join(f"{k} {flatten_features(v)}" for k, v in features.items())
+    if isinstance(features, (list, tuple)):
+        return " ".join(flatten_features(v) for v in features)
+    return "" if features is None else str(features)
+
+
+def build_search_vector(product):
+    """Weighted SearchVector expression for one product instance."""
+    vector = None
+    for field, weight in DOCUMENT_WEIGHTS:
+        raw = getattr(product, field, "")
+        text = flatten_features(raw) if field == "features" else raw
+        part = SearchVector(Value(normalize_persian(text)), config=SEARCH_CONFIG, weight=weight)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_search_vector(product):
+    """Write the search vector with an UPDATE so save() signals are not re-triggered."""
+    type(product).objects.filter(pk=product.pk).update(search_vector=build_search_vector(product))
+
+
+def build_search_query(q: str):
+    """
+    Prefix-matching AND query from user input ("گردنبند طل" matches "گردنبند طلا").
+    Returns None when nothing searchable is left after normalization.
+    """
+    tokens = _TOKEN_RE.findall(normalize_persian(q))
+    if not tokens:
+        return None
+    raw = " & ".join(f"{t}:*" for t in tokens)
+    return SearchQuery(raw, config=SEARCH_CONFIG, search_type="raw")
+
+
+def search_products(qs, q: str, ranked: bool = True):
+    """Filter `qs` to products matching `q`; with ranked=True order best matches first."""
+    query = build_search_query(q)
+    if query is None:
+        return qs.none()
+    qs = qs.filter(search_vector=query)
+    if ranked:
+        qs = qs.annotate(rank=SearchRank(F("search_vector"), query)).order_by("-rank", "-created_at")
+    return qs
@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from . import facets
+from .models.brand import Brand
+from .models.product import Product
+from .read_model import invalidate, referencing
+from .search import update_search_vector
+
+
+@receiver(post_save, sender=Product)
+def refresh_search_vector(sender, instance, update_fields=None, **kwargs):
+    # images-only saves (extra uploads) don't touch searchable text
+    if update_fields and set(update_fields) <= {"images", "search_vector"}:
+        return
+    update_search_vector(instance)
+
+
+# ---------- product detail read model (products.read_model) ----------
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_detail(sender, instance, update_fields=None, **kwargs):
+    ids = [instance.pk]
+    # products listing this one show its name (and hide it once inactive)
+    if not (update_fields and set(update_fields) <= {"images", "search_vector"}):
+        ids += referencing("rel_products", instance.pk)
+    invalidate(ids)
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def invalidate_detail_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate([instance.pk])
+    elif action == "pre_clear":
+        invalidate(instance.products.values_list("pk", flat=True))
+    else:
+        invalidate(pk_set)
+
+
+@receiver(post_save, sender=Brand)
+@receiver(pre_delete, sender=Brand)  # before the products' brand is set to NULL
+@receiver(post_save, sender="categories.Category")
+@receiver(pre_delete, sender="categories.Category")  # before the M2M rows go
+def invalidate_detail_of_linked_products(sender, instance, **kwargs):
+    invalidate(instance.products.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender="blogs.Blog")
+@receiver(post_delete, sender="blogs.Blog")
+def invalidate_detail_of_blog_referrers(sender, instance, **kwargs):
+    invalidate(referencing("rel_blogs", instance.pk))
+
+
+@receiver(post_save, sender="news.News")
+@receiver(post_delete, sender="news.News")
+def invalidate_detail_of_news_referrers(sender, instance, **kwargs):
+    invalidate(referencing("rel_news", instance.pk))
+
+
+# ---------- facet counts (products.facets) ----------
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(m2m_changed, sender=Product.categories.through)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_facet_counts(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"images", "search_vector"}:
+        return
+    transaction.on_commit(facets.bump_version)
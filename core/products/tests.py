@@ -1,3 +1,34 @@
-from django.test import TestCase
+from django.http import QueryDict
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from . import facets
+from .models.product import Product
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FacetCountTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        Product.objects.create(
+            name="انگشتر طلا", english_name="ring", price=12000, owner_name="o", owner_profile="http://x",
+            short_description="s", description="d",
+        )
+
+    def test_query_without_searchable_tokens_has_empty_counts(self):
+        for q in ("!!!", "؟"):
+            counts = facets.facet_counts(facets.parse_filters(QueryDict(f"q={q}")))
+            self.assertEqual(counts["brands"], [])
+            self.assertEqual(counts["price"], [])
+            self.assertEqual(counts["featured"], 0)
+
+    def test_product_list_with_unsearchable_query_is_empty(self):
+        response = self.client.get("/products/", {"q": "!!!"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["products"]), [])
+
+    def test_counts_without_filters(self):
+        counts = facets.facet_counts(facets.parse_filters(QueryDict()))
+        self.assertEqual(sum(band["count"] for band in counts["price"]), 1)
@@ -1,9 +1,14 @@
 # products/views.py
+import uuid
 from django.views.generic import TemplateView, ListView, DetailView
 from django.http import Http404
-from django.db.models import Q, Prefetch
+from django.db.models import Prefetch
 from .models.product import Product
+from . import facets
+from .read_model import get_product_detail
+from categories.models import Category
 from categories.services import ProductCategoryService
+from core.pagination import KeysetPaginationMixin
 
 
 def _map_category_doc(doc):
@@ -20,6 +25,17 @@ def _map_category_doc(doc):
     }
 
 
+def _resolve_category(value):
+    """Accept either a Category UUID or its slug."""
+    if not value:
+        return None
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return Category.objects.filter(slug=value).first()
+    return Category.objects.filter(pk=value).first()
+
+
 # ===== Categories (Mongo) =====
 class ProductCategoryListPage(TemplateView):
     template_name = "products/category_list.html"
@@ -37,57 +53,53 @@ class ProductCategoryDetailPage(TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        category_id = kwargs.get("pk")
-        service = ProductCategoryService()
-        doc = service.get_category(category_id)
-        category = _map_category_doc(doc)
-        if not category:
+        cat = _resolve_category(kwargs.get("pk"))
+        if not cat:
             raise Http404("Category not found")
 
-        ctx["category"] = category
+        service = ProductCategoryService()
+        ctx["category"] = {
+            "id": str(cat.id),
+            "name": cat.name,
+            "english_name": cat.english_name,
+            "sub_categories": [c["id"] for c in service.get_active_categories_by_parent(str(cat.id))],
+            "image": cat.image.url if cat.image else "",
+            "slug": cat.slug,
+            "parent_id": str(cat.parent_id) if cat.parent_id else None,
+        }
+        # products of this category and all of its sub-categories
         ctx["products"] = (
-            Product.objects.select_related("brand")
-            .filter(is_active=True, category_id=category_id)
+            Product.objects.cards()
+            .filter(is_active=True)
+            .in_category(cat)
             .order_by("-created_at")
         )
         return ctx
 
 
 # ===== Products (Postgres) =====
-class ProductListPage(ListView):
+class ProductListPage(KeysetPaginationMixin, ListView):
     template_name = "products/product_list.html"
     context_object_name = "products"
     paginate_by = 12
+    keyset_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
+        # brand / price band / featured / feature filters, plus q and category (products.facets)
+        self.filters = facets.parse_filters(self.request.GET, _resolve_category(self.request.GET.get("category")))
         qs = (
-            Product.objects.select_related("brand")
+            Product.objects.cards()
             .filter(is_active=True)
-            .order_by("-created_at")
+            .order_by(*self.keyset_ordering)
         )
-        # Optional filters
-        category = self.request.GET.get("category")
-        if category:
-            qs = qs.filter(category_id=category)
-
-        q = self.request.GET.get("q")
-        if q:
-            qs = qs.filter(
-                Q(name__icontains=q) |
-                Q(english_name__icontains=q) |
-                Q(short_description__icontains=q) |
-                Q(description__icontains=q)
-            )
-
-        brand = self.request.GET.get("brand")
-        if brand:
-            qs = qs.filter(brand__name__iexact=brand)
+        return facets.apply_filters(qs, self.filters)
 
-        featured = self.request.GET.get("featured")
-        if featured in {"1", "true", "True"}:
-            qs = qs.filter(featured=True)
-
-        return qs
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # counts for every facet in one grouped query, cached per filter combination
+        context["facets"] = facets.with_links(facets.facet_counts(self.filters), self.filters)
+        context["filters"] = self.filters
+        return context
 
 
 class ProductDetailPage(DetailView):
@@ -95,8 +107,12 @@ class ProductDetailPage(DetailView):
     model = Product
     context_object_name = "product"
 
-    def get_queryset(self):
-        return Product.objects.select_related("brand").filter(is_active=True)
+    def get_object(self, queryset=None):
+        # cached projection (products.read_model): brand, categories and related titles in one lookup
+        detail = get_product_detail(self.kwargs["pk"])
+        if detail is None or not detail["is_active"]:
+            raise Http404("Product not found")
+        return detail
 
 
 class FeaturedProductsPage(ListView):
@@ -106,7 +122,7 @@ class FeaturedProductsPage(ListView):
 
     def get_queryset(self):
         return (
-            Product.objects.select_related("brand")
+            Product.objects.cards()
             .filter(is_active=True, featured=True)
             .order_by("-created_at")
         )
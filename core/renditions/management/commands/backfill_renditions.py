@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management import BaseCommand
+from django.db import connections
+
+from renditions.services import generate, iter_source_names
+
+
+def _init_worker():
+    # spawn-based pools (macOS/Windows) start without Django configured
+    django.setup()
+
+
+def _generate(args):
+    name, force = args
+    try:
+        manifest = generate(name, force=force)
+    except Exception as e:  # one broken file must not stop the backfill
+        return name, None, str(e)
+    return name, manifest, None
+
+
+class Command(BaseCommand):
+    help = "Generates WebP/JPEG renditions for every stored product/content image, in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes.")
+        parser.add_argument("--force", action="store_true", help="Re-encode images that already have renditions.")
+
+    def handle(self, *args, **opts):
+        names = sorted(set(iter_source_names()))
+        self.stdout.write(f"  … {len(names)} images")
+        # forked workers must not share the parent's database sockets
+        connections.close_all()
+
+        done = skipped = 0
+        with ProcessPoolExecutor(max_workers=opts["workers"], initializer=_init_worker) as pool:
+            jobs = ((name, opts["force"]) for name in names)
+            for i, (name, manifest, error) in enumerate(pool.map(_generate, jobs, chunksize=8), 1):
+                if manifest:
+                    done += 1
+                else:
+                    skipped += 1
+                    self.stderr.write(f"  ! {name}: {error or 'missing or not an image'}")
+                if i % 100 == 0:
+                    self.stdout.write(f"  … {i}/{len(names)}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Renditions ready for {done} images ({skipped} skipped)."))
@@ -0,0 +1,218 @@
+"""
+Image renditions: fixed-width WebP/JPEG copies of uploaded images.
+
+For a stored image "product/views/ring.png" the renditions sit next to it:
+
+    product/views/ring.w320.webp   product/views/ring.w320.jpg
+    product/views/ring.w640.webp   ...
+    product/views/ring.renditions.json   <- manifest: {"width", "height", "widths", "formats"}
+
+Widths above the original are not generated (no upscaling). generate() is
+run by renditions.tasks.generate_renditions_task when an image field is saved
+(renditions.signals) and by `manage.py backfill_renditions` for existing media.
+Templates read the manifest through get_manifest() (cached) and emit srcset
+with the {% picture %} tag; until the renditions exist they get the original.
+"""
+import hashlib
+import io
+import json
+import posixpath
+import re
+from urllib.parse import unquote
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+# bump when the encoding below changes; older manifests are regenerated by the backfill
+RENDITION_VERSION = 1
+DEFAULT_WIDTHS = (320, 640, 960, 1280, 1920)
+DEFAULT_FORMATS = ("webp", "jpeg")
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg", "avif": "avif"}
+MIME_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg", "avif": "image/avif"}
+SAVE_OPTIONS = {
+    "webp": {"quality": 80, "method": 4},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+    "avif": {"quality": 60},
+}
+_RENDITION_RE = re.compile(r"(\.w\d+\.(webp|jpg|avif)|\.renditions\.json)$")
+MANIFEST_TTL = 24 * 3600
+MISSING_TTL = 300  # "no renditions yet" is re-checked after this long
+
+# model -> image fields that get renditions; a JSONField holds a list of media URLs/paths
+SOURCES = {
+    "products.Product": ("view_image", "images"),
+    "products.Brand": ("image",),
+    "blogs.Blog": ("view_image",),
+    "news.News": ("view_image",),
+    "banners.Banner": ("image",),
+    "heroes.Hero": ("background_image",),
+}
+
+
+def widths():
+    return tuple(getattr(settings, "IMAGE_RENDITION_WIDTHS", DEFAULT_WIDTHS))
+
+
+def formats():
+    # AVIF only where this Pillow build can encode it
+    configured = getattr(settings, "IMAGE_RENDITION_FORMATS", DEFAULT_FORMATS)
+    return tuple(fmt for fmt in configured if fmt != "avif" or features.check("avif"))
+
+
+# =====================================
+# Names
+# =====================================
+
+def storage_name(value):
+    """FieldFile, storage name or MEDIA_URL-prefixed URL -> storage name; None for empty/external."""
+    if isinstance(value, FieldFile):
+        return value.name or None
+    if not value or not isinstance(value, str):
+        return None
+    if value.startswith(settings.MEDIA_URL):
+        return unquote(value[len(settings.MEDIA_URL):]) or None
+    if value.startswith(("/", "http://", "https://", "data:")):
+        return None
+    return value
+
+
+def _stem(name):
+    return posixpath.splitext(name)[0]
+
+
+def rendition_name(name, width, fmt):
+    return f"{_stem(name)}.w{width}.{EXTENSIONS[fmt]}"
+
+
+def manifest_name(name):
+    return f"{_stem(name)}.renditions.json"
+
+
+def is_rendition(name):
+    """Renditions and manifests live next to originals; never treat them as sources."""
+    return bool(_RENDITION_RE.search(name))
+
+
+def image_names(instance):
+    """Storage names of every rendition source on `instance` (see SOURCES)."""
+    names = []
+    for field in SOURCES.get(instance._meta.label, ()):
+        value = getattr(instance, field, None)
+        for item in value if isinstance(value, list) else [value]:
+            name = storage_name(item)
+            if name and not is_rendition(name):
+                names.append(name)
+    return names
+
+
+def iter_source_names():
+    """Every rendition source currently referenced by a model row (for the backfill)."""
+    for label, fields in SOURCES.items():
+        model = apps.get_model(label)
+        for instance in model.objects.only("pk", *fields).iterator(chunk_size=500):
+            yield from image_names(instance)
+
+
+# =====================================
+# Generation
+# =====================================
+
+def _target_widths(original_width):
+    return sorted({min(w, original_width) for w in widths()})
+
+
+def _normalized(img):
+    """RGB, or RGBA when the image has transparency (palette/LA/CMYK/16-bit inputs included)."""
+    if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+        return img.convert("RGBA")
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+
+def _encode(img, fmt):
+    if fmt == "jpeg" and img.mode == "RGBA":
+        # JPEG has no alpha: flatten onto white
+        flat = Image.new("RGB", img.size, (255, 255, 255))
+        flat.paste(img, mask=img.getchannel("A"))
+        img = flat
+    buf = io.BytesIO()
+    img.save(buf, format=fmt.upper(), **SAVE_OPTIONS.get(fmt, {}))
+    return buf.getvalue()
+
+
+def _write(name, data):
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(data))
+
+
+def _read_manifest(name):
+    try:
+        with default_storage.open(manifest_name(name), "rb") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def generate(name, force=False):
+    """
+    Write the renditions + manifest of the stored image `name` -> manifest,
+    or None when the file is missing or not an image. Up-to-date renditions
+    are kept unless force=True.
+    """
+    if not force:
+        manifest = _read_manifest(name)
+        if manifest and manifest.get("version") == RENDITION_VERSION and manifest.get("formats") == list(formats()):
+            return manifest
+    try:
+        with default_storage.open(name, "rb") as f:
+            img = Image.open(f)
+            img = _normalized(ImageOps.exif_transpose(img))  # phone photos: apply the rotation flag
+    except (FileNotFoundError, UnidentifiedImageError, OSError):
+        return None
+
+    width, height = img.size
+    done = []
+    for w in sorted(_target_widths(width), reverse=True):
+        h = max(1, round(height * w / width))
+        resized = img if w == width else img.resize((w, h), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for fmt in formats():
+            _write(rendition_name(name, w, fmt), _encode(resized, fmt))
+        done.append(w)
+
+    manifest = {"version": RENDITION_VERSION, "width": width, "height": height,
+                "widths": sorted(done), "formats": list(formats())}
+    _write(manifest_name(name), json.dumps(manifest).encode())
+    cache.set(_manifest_key(name), manifest, MANIFEST_TTL)
+    return manifest
+
+
+# =====================================
+# Reads (templates)
+# =====================================
+
+def _manifest_key(name):
+    return "rendition:" + hashlib.sha1(name.encode()).hexdigest()
+
+
+def get_manifest(name):
+    """The manifest of `name`, or None while it has no renditions. Cached, including misses."""
+    key = _manifest_key(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = _read_manifest(name) or {}
+        cache.set(key, manifest, MANIFEST_TTL if manifest else MISSING_TTL)
+    return manifest or None
+
+
+def srcset(value, fmt="webp"):
+    """'url 320w, url 640w, ...' for an image field / name / media URL; '' without renditions."""
+    name = storage_name(value)
+    manifest = get_manifest(name) if name else None
+    if not manifest or fmt not in manifest["formats"]:
+        return ""
+    return ", ".join(f"{default_storage.url(rendition_name(name, w, fmt))} {w}w" for w in manifest["widths"])
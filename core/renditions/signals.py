@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from .services import SOURCES, get_manifest, image_names
+
+
+def queue_renditions(sender, instance, **kwargs):
+    # images that already have renditions (most re-saves) are skipped before queueing
+    names = [name for name in image_names(instance) if get_manifest(name) is None]
+    if names:
+        transaction.on_commit(lambda: _queue(names))
+
+
+def _queue(names):
+    from .tasks import generate_renditions_task
+    for name in names:
+        generate_renditions_task.delay(name)
+
+
+for label in SOURCES:
+    post_save.connect(queue_renditions, sender=label, dispatch_uid=f"renditions:{label}")
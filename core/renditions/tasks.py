@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from .services import generate
+
+
+@shared_task(name="generate_renditions_task")
+def generate_renditions_task(name):
+    """Renditions of one stored image (storage name); skipped when they already exist."""
+    manifest = generate(name)
+    return manifest["widths"] if manifest else []
@@ -0,0 +1,53 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from renditions import services
+
+register = template.Library()
+
+
+def _url(image):
+    if isinstance(image, FieldFile):
+        return image.url if image.name else ""
+    if isinstance(image, str) and image and services.storage_name(image) == image:
+        return default_storage.url(image)  # bare storage name
+    return image or ""
+
+
+@register.simple_tag
+def srcset(image, fmt="webp"):
+    """{% srcset product.view_image "jpeg" %} -> "…w320.jpg 320w, …w640.jpg 640w" ('' until generated)."""
+    return services.srcset(image, fmt)
+
+
+@register.simple_tag
+def picture(image, alt="", sizes="100vw", css="", loading="lazy"):
+    """
+    {% picture product.view_image alt=product.name sizes="(min-width: 768px) 25vw, 50vw" css="w-full" %}
+
+    <picture> with a WebP <source> and a JPEG srcset on the <img>; a plain
+    <img> of the original until the renditions exist. Accepts an image field,
+    a storage name or a MEDIA_URL path (Product.images entries).
+    """
+    src = _url(image)
+    if not src:
+        return ""
+    name = services.storage_name(image)
+    manifest = services.get_manifest(name) if name else None
+    if not manifest:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="{}">', src, alt, css, loading)
+
+    sources = [
+        format_html('<source type="{}" srcset="{}" sizes="{}">', services.MIME_TYPES[fmt], services.srcset(image, fmt), sizes)
+        for fmt in manifest["formats"] if fmt != "jpeg"
+    ]
+    fallback = services.srcset(image, "jpeg") if "jpeg" in manifest["formats"] else ""
+    img = format_html(
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" loading="{}">',
+        src, fallback, sizes, manifest["width"], manifest["height"], alt, css, loading,
+    )
+    # the parts were escaped by format_html above
+    return format_html("<picture>{}{}</picture>", mark_safe("".join(sources)), img)
@@ -0,0 +1,196 @@
+"""
+Seller dashboard numbers, shared by the HTML pages, the exports and the
+weekly report task.
+
+Sales figures come from orders.models.DailySalesRollup (the seller's "s:<id>"
+and "p:<id>" buckets); customer and cart figures are grouped queries over
+Order/OrderItem/CartItem restricted to the seller's products and an
+indexed created_at range. Summaries are cached per (seller, range).
+"""
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from inventory import services as inventory
+from inventory.models import StockLevel
+from orders import rollup
+from orders.models import CartItem, DailySalesRollup, OrderItem
+
+# statuses that count as a sale (pending/failed never do)
+SOLD_STATUSES = ("paid", "sent", "delivered")
+UNPAID_STATUSES = ("pending", "failed")
+SERIES_DAYS = 30
+SUMMARY_DAYS = 30
+SUMMARY_CACHE_TTL = 300
+TOP_PRODUCTS = 10
+
+
+def profit_rate() -> float:
+    # Products carry no cost price yet, so net profit is a configured share of revenue.
+    return float(getattr(settings, "SELLER_PROFIT_RATE", 0.25))
+
+
+def time_series(seller, measure="revenue", days=SERIES_DAYS, rate=1.0):
+    """
+    Chart + headline numbers for one measure ("revenue" / "order_count" / "items_sold").
+
+    -> {"chart_labels", "chart_data", "today", "week", "month"}
+    `rate` scales every value (used for the profit view).
+    """
+    bucket = DailySalesRollup.seller_bucket(seller.pk)
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    series = rollup.daily_series(start, days, bucket=bucket, status=SOLD_STATUSES, measure=measure)
+    data = [round(v * rate) for v in series["data"]]
+    return {
+        "chart_labels": series["labels"],
+        "chart_data": data,
+        "today": data[-1],
+        "week": sum(data[-7:]),
+        "month": sum(data[-30:]),
+    }
+
+
+# =====================================
+# Summary
+# =====================================
+
+def date_range_from_request(request, default_days=SUMMARY_DAYS):
+    """?start=YYYY-MM-DD&end=YYYY-MM-DD -> (start, end) dates, inclusive; defaults to the last 30 days."""
+    end = _parse_date(request.GET.get("end")) or timezone.localdate()
+    start = _parse_date(request.GET.get("start")) or end - timedelta(days=default_days - 1)
+    if start > end:
+        start, end = end, start
+    return start, end
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _day_bounds(start_date, end_date):
+    """Inclusive date range -> [aware start, aware end) datetimes for created_at filters."""
+    start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    return start, end
+
+
+def get_summary_data(seller, start_date, end_date):
+    """Cached summary() for (seller, range)."""
+    key = f"seller:analytics:{seller.pk}:{start_date.isoformat()}:{end_date.isoformat()}"
+    data = cache.get(key)
+    if data is None:
+        data = summary(seller, start_date, end_date)
+        cache.set(key, data, SUMMARY_CACHE_TTL)
+    return data
+
+
+def summary(seller, start_date, end_date):
+    """
+    -> {"start_date", "end_date", "total_sales", "net_profit", "total_orders", "items_sold",
+        "average_order_value", "new_customers", "returning_customers",
+        "cart_abandonment_rate", "open_carts", "top_products": [...], "low_stock_products": [...]}
+
+    Everything is for the range except open_carts and low_stock_products, which are current.
+    """
+    bucket = DailySalesRollup.seller_bucket(seller.pk)
+    sold = rollup.bucket_total(start_date, end_date, bucket=bucket, status=SOLD_STATUSES)
+    unpaid = rollup.bucket_total(start_date, end_date, bucket=bucket, status=UNPAID_STATUSES)
+    customers = customer_counts(seller, start_date, end_date)
+
+    # abandonment = checkouts in the range that were never paid. Open carts carry no date,
+    # so they are reported on their own as a current figure, not mixed into the rate.
+    abandoned = unpaid["order_count"]
+    attempts = abandoned + sold["order_count"]
+    open_carts = CartItem.objects.filter(product__seller=seller).values("user").distinct().count()
+
+    revenue = sold["revenue"]
+    orders = sold["order_count"]
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "total_sales": revenue,
+        "net_profit": round(revenue * profit_rate()),
+        "total_orders": orders,
+        "items_sold": sold["items_sold"],
+        "average_order_value": round(revenue / orders) if orders else 0,
+        "new_customers": customers["new"],
+        "returning_customers": customers["returning"],
+        "cart_abandonment_rate": round(100 * abandoned / attempts, 1) if attempts else 0,
+        "open_carts": open_carts,
+        "top_products": top_products(seller, start_date, end_date),
+        "low_stock_products": low_stock_products(seller),
+    }
+
+
+def top_products(seller, start_date, end_date, limit=TOP_PRODUCTS):
+    """Best sellers by revenue -> [{"name", "quantity_sold", "revenue"}]."""
+    rows = (
+        DailySalesRollup.objects
+        .filter(seller=seller, product__isnull=False, status__in=SOLD_STATUSES,
+                day__gte=start_date, day__lte=end_date)
+        .values("product_id", "product__name")
+        .annotate(quantity_sold=Sum("items_sold"), revenue=Sum("revenue"))
+        .order_by("-revenue")[:limit]
+    )
+    return [
+        {"name": r["product__name"], "quantity_sold": int(r["quantity_sold"] or 0), "revenue": int(r["revenue"] or 0)}
+        for r in rows
+    ]
+
+
+def low_stock_products(seller, limit=TOP_PRODUCTS * 5):
+    """Seller's products at or under their stock threshold -> [{"name", "current_stock", "min_stock"}]."""
+    rows = inventory.low_stock(StockLevel.objects.filter(product__seller=seller), limit=limit)
+    return [
+        {"name": r.product.name, "current_stock": r.available, "min_stock": r.low_stock_threshold}
+        for r in rows
+    ]
+
+
+def customer_counts(seller, start_date, end_date):
+    """
+    Customers who bought from the seller in the range, split by whether their
+    first purchase from this seller falls inside it -> {"new", "returning"}.
+    """
+    start, end = _day_bounds(start_date, end_date)
+    per_customer = (
+        OrderItem.objects
+        .filter(seller=seller, order__status__in=SOLD_STATUSES, order__created_at__lt=end)
+        .values("order__user")
+        .annotate(
+            first_order=Min("order__created_at"),
+            in_range=Count("order", filter=Q(order__created_at__gte=start)),
+        )
+        .filter(in_range__gt=0)
+    )
+    counts = per_customer.aggregate(
+        new=Count("order__user", filter=Q(first_order__gte=start)),
+        returning=Count("order__user", filter=Q(first_order__lt=start)),
+    )
+    return {k: v or 0 for k, v in counts.items()}
+
+
+def export_payload(data):
+    """summary() -> the {"summary": {label: value}, "top_products", "low_stock_products"} shape the exporters take."""
+    return {
+        "summary": {
+            "بازه": f"{data['start_date']} تا {data['end_date']}",
+            "درآمد کل": f"{data['total_sales']:,} تومان",
+            "تعداد کل سفارش‌ها": data["total_orders"],
+            "سود خالص": f"{data['net_profit']:,} تومان",
+            "میانگین ارزش سفارش": f"{data['average_order_value']:,} تومان",
+            "نرخ ترک سبد خرید": f"{data['cart_abandonment_rate']}%",
+            "سبدهای باز (اکنون)": data.get("open_carts", 0),
+            "مشتریان جدید": data["new_customers"],
+            "مشتریان بازگشتی": data["returning_customers"],
+        },
+        "top_products": data["top_products"],
+        "low_stock_products": data["low_stock_products"],
+    }
@@ -7,7 +7,7 @@ from openpyxl.utils import get_column_letter
 from io import BytesIO
 
 from accounts.models import User
-from seller_dashboard.views import SellerDashboardSummaryView
+from seller_dashboard import analytics
 
 @shared_task(name="send_weekly_report_task")
 def send_weekly_report_task(user_id):
@@ -16,8 +16,8 @@ def send_weekly_report_task(user_id):
         start_date = now().date() - timedelta(days=7)
         end_date = now().date()
 
-        summary = SellerDashboardSummaryView()
-        summary_data = summary.get_summary_data(user, start_date, end_date)
+        report = analytics.get_summary_data(user, start_date, end_date)
+        summary_data = analytics.export_payload(report)["summary"]
 
         # Create Excel
         wb = openpyxl.Workbook()
@@ -44,7 +44,7 @@ def send_weekly_report_task(user_id):
             <p>Your weekly dashboard summary is attached.</p>
             <p>Thanks,<br>The Team</p>
             """,
-            to=[user.email],
+            to=[user.seller.email],
         )
         email.content_subtype = "html"
         email.attach("dashboard_summary.xlsx", buffer.read(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
@@ -1,82 +1,30 @@
 from django.contrib import messages
 from django.shortcuts import render, redirect
-from .utils import generate_excel_report, generate_csv_report
+from . import analytics
+from exports.services import start_export
 from django.contrib.auth.decorators import login_required, user_passes_test
 
 
-def seller_summary_view(request):
-    # Dummy data - replace with real DB queries
-    seller_data = {
-        'summary': {
-            'درآمد کل': '120,000,000 تومان',
-            'تعداد کل سفارش‌ها': 245,
-            'سود خالص': '30,000,000 تومان',
-            'میانگین ارزش سفارش': '489,000 تومان',
-            'نرخ ترک سبد خرید': '38%',
-            'مشتریان جدید': 89,
-            'مشتریان بازگشتی': 156,
-        },
-        'top_products': [
-            {'name': 'گوشواره طلای ۱۸ عیار', 'quantity_sold': 45, 'revenue': 22_500_000},
-            {'name': 'انگشتر نامزدی طلا', 'quantity_sold': 38, 'revenue': 19_000_000},
-            {'name': 'دستبند زنجیری طلا', 'quantity_sold': 32, 'revenue': 16_000_000},
-        ],
-        'low_stock_products': [
-            {'name': 'گردنبند مروارید', 'current_stock': 2, 'min_stock': 5},
-            {'name': 'ساعت طلای مردانه', 'current_stock': 1, 'min_stock': 3},
-        ]
-    }
-
-    return render(request, 'seller_dashboard/summary.html', {'summary': seller_data})
+def _seller_report(request):
+    start, end = analytics.date_range_from_request(request)
+    return analytics.get_summary_data(request.user, start, end)
+
+
+def _start_seller_export(request, fmt):
+    # built by a Celery worker (exports.tasks); the page polls the job's progress
+    start, end = analytics.date_range_from_request(request)
+    job = start_export(request.user, "seller_report", {"start": start.isoformat(), "end": end.isoformat()}, fmt=fmt)
+    return redirect('exports:job_detail', pk=job.pk)
 
 
+@login_required
 def export_excel(request):
-    seller_data = {
-        'summary': {
-            'درآمد کل': '120,000,000 تومان',
-            'تعداد کل سفارش‌ها': 245,
-            'سود خالص': '30,000,000 تومان',
-            'میانگین ارزش سفارش': '489,000 تومان',
-            'نرخ ترک سبد خرید': '38%',
-            'مشتریان جدید': 89,
-            'مشتریان بازگشتی': 156,
-        },
-        'top_products': [
-            {'name': 'گوشواره طلای ۱۸ عیار', 'quantity_sold': 45, 'revenue': 22_500_000},
-            {'name': 'انگشتر نامزدی طلا', 'quantity_sold': 38, 'revenue': 19_000_000},
-        ],
-        'low_stock_products': [
-            {'name': 'گردنبند مروارید', 'current_stock': 2, 'min_stock': 5},
-        ]
-    }
-
-    # ✅ Use phone_number instead of username
-    user_identifier = request.user.phone_number
-
-    return generate_excel_report(seller_data, filename="گزارش_فروشنده_" + user_identifier)
+    return _start_seller_export(request, "xlsx")
 
 
+@login_required
 def export_csv(request):
-    seller_data = {
-        'summary': {
-            'درآمد کل': '120,000,000 تومان',
-            'تعداد کل سفارش‌ها': 245,
-            'سود خالص': '30,000,000 تومان',
-            'میانگین ارزش سفارش': '489,000 تومان',
-        },
-        'top_products': [
-            {'name': 'گوشواره طلای ۱۸ عیار', 'quantity_sold': 45, 'revenue': 22_500_000},
-            {'name': 'انگشتر نامزدی طلا', 'quantity_sold': 38, 'revenue': 19_000_000},
-        ],
-        'low_stock_products': [
-            {'name': 'گردنبند مروارید', 'current_stock': 2, 'min_stock': 5},
-        ]
-    }
-
-    # ✅ Use phone_number instead of username
-    user_identifier = request.user.phone_number
-
-    return generate_csv_report(seller_data, filename="گزارش_فروشنده_" + user_identifier)
+    return _start_seller_export(request, "csv")
 
 
 def schedule_weekly_report(request):
@@ -93,22 +41,25 @@ def seller_dashboard_home(request):
 
 @login_required
 def seller_summary_view(request):
-    return render(request, 'seller_dashboard/summary.html')
+    return render(request, 'seller_dashboard/summary.html', {'summary': _seller_report(request)})
 
 
 @login_required
 def revenue_time_series_view(request):
-    return render(request, 'seller_dashboard/revenue_time_series.html')
+    context = analytics.time_series(request.user, measure="revenue")
+    return render(request, 'seller_dashboard/revenue_time_series.html', context)
 
 
 @login_required
 def order_time_series_view(request):
-    return render(request, 'seller_dashboard/order_time_series.html')
+    context = analytics.time_series(request.user, measure="order_count")
+    return render(request, 'seller_dashboard/order_time_series.html', context)
 
 
 @login_required
 def profit_time_series_view(request):
-    return render(request, 'seller_dashboard/profit_time_series.html')
+    context = analytics.time_series(request.user, measure="revenue", rate=analytics.profit_rate())
+    return render(request, 'seller_dashboard/profit_time_series.html', context)
 
 
 @login_required
@@ -118,7 +69,8 @@ def top_products_view(request):
 
 @login_required
 def low_stock_products_view(request):
-    return render(request, 'seller_dashboard/low_stock_products.html')
+    products = analytics.low_stock_products(request.user)
+    return render(request, 'seller_dashboard/low_stock_products.html', {"products": products})
 
 
 @login_required
@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.utils.text import slugify
 from django.core.validators import RegexValidator
 
@@ -23,6 +24,10 @@ class Tag(models.Model):
         verbose_name = "برچسب"
         verbose_name_plural = "برچسب‌ها"
         ordering = ["name"]
+        indexes = [
+            GinIndex(fields=["name"], name="tag_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["slug"], name="tag_slug_trgm", opclasses=["gin_trgm_ops"]),
+        ]
 
     def __str__(self):
         return self.name
@@ -1,15 +1,14 @@
-import openpyxl
-from io import BytesIO
 from datetime import timedelta
 from news.models.news import News
 from blogs.models.blog import Blog
-from django.shortcuts import render
+from django.shortcuts import render, redirect
 from django.utils.timezone import now
 from django.db.models import Avg, Count
 from django.views.generic import TemplateView
-from django.http import Http404, HttpResponse
+from django.http import Http404
 from django.db.models.functions import TruncDate
 from django.contrib.auth.decorators import login_required, user_passes_test
+from exports.services import start_export
 
 
 @login_required
@@ -165,26 +164,6 @@ def writer_export_content(request):
     if getattr(request.user, "role", "") != "writer":
         raise Http404
 
-    wb = openpyxl.Workbook()
-    ws_blog = wb.active
-    ws_blog.title = 'Blogs'
-    blogs = Blog.objects.filter(writer=request.user)
-    ws_blog.append(['ID', 'Name', 'Publish Time', 'Read Time'])
-    for b in blogs:
-        ws_blog.append([b.id, b.name, b.publish_time, b.read_time])
-
-    ws_news = wb.create_sheet(title='News')
-    news_qs = News.objects.filter(writer=request.user)
-    ws_news.append(['ID', 'Name', 'Publish Time', 'Read Time'])
-    for n in news_qs:
-        ws_news.append([n.id, n.name, n.publish_time, n.read_time])
-
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    response = HttpResponse(
-        buffer,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename="writer_content.xlsx"'
-    return response
+    # built in the background (exports.jobs.writer_content); the page polls progress
+    job = start_export(request.user, 'writer_content', {}, fmt='xlsx')
+    return redirect('exports:job_detail', pk=job.pk)